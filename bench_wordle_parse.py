@@ -0,0 +1,51 @@
+# bench_wordle_parse.py
+# micro-benchmark for wordle_parse: python bench_wordle_parse.py
+import re
+import time
+
+from wordle_parse import FAIL, parse_share, parse_wordle
+
+SHARES = [
+    "Wordle 1,234 3/6\n\n⬛🟨⬛⬛⬛\n⬛🟩🟩⬛🟨\n🟩🟩🟩🟩🟩",
+    "Wordle 1.234 X/6*\n\n⬛⬛⬛⬛⬛\n⬛🟨⬛⬛⬛\n⬛🟩⬛⬛⬛\n🟨🟩⬛⬛⬛\n🟩🟩⬛🟩⬛\n🟩🟩⬛🟩🟩",
+    "Wordle 987 4/6",
+    "Wordle 1\u202f500 2/6*\n🟧🟦⬜⬜⬜\n🟧🟧🟧🟧🟧",
+]
+CHATTER = [
+    "lol did anyone else get the wordle today",
+    "gm", "brb 5 min", "the meeting moved to 3/6 at noon",
+    "https://example.com/some/long/link?with=query&and=more",
+    "!leaderboard", "Wordle was rough today ngl " * 4,
+]
+OLD_RE = re.compile(r"Wordle\s+([\d,]+)\s+(\d|X)/6")
+
+
+def old_parse(content):
+    # the parser wordle_parse replaced, for comparison
+    m = OLD_RE.search(content)
+    if not m:
+        return None
+    return m.group(1).replace(",", ""), FAIL if m.group(2) == "X" else int(m.group(2))
+
+
+def main(rounds: int = 2000):
+    corpora = {
+        "shares": SHARES,
+        "chatter": CHATTER,
+        "mixed": SHARES * 5 + CHATTER * 15,       # roughly the mix a busy server sees
+    }
+    for name, corpus in corpora.items():
+        for label, fn in (("old", old_parse), ("parse_wordle", parse_wordle), ("parse_share", parse_share)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for msg in corpus:
+                    fn(msg)
+            elapsed = time.perf_counter() - start
+            print(f"{name:8} {label:12} {rounds * len(corpus) / elapsed:12,.0f} msgs/s")
+
+    for msg in SHARES:
+        print(repr(msg.split("\n")[0]), "->", parse_share(msg))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
 # cogs/admin.py
 from pathlib import Path
 from datetime import datetime
-import shutil
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database import get_db
+from repository import repo
 from config import LOSER_DATA_PATH
 from scheduler import post_weekly_message, evaluate_week, reset_week, backup_now
 
@@ -45,30 +44,21 @@ class AdminCog(commands.Cog):
 
     @app_commands.command(name="join", description="Join the weekly Loser Challenge.")
     async def join(self, interaction: discord.Interaction):
-        conn = get_db(); cur = conn.cursor()
-        cur.execute(
-            "INSERT OR REPLACE INTO participants (user_id, username, active) VALUES (?, ?, 1)",
-            (interaction.user.id, interaction.user.name),
-        )
-        conn.commit(); conn.close()
+        await repo.join(interaction.user.id, interaction.user.name)
         await interaction.response.send_message(
             f"✅ {interaction.user.mention} joined the Loser Challenge!", ephemeral=True
         )
 
     @app_commands.command(name="leave", description="Leave the challenge (you can rejoin anytime).")
     async def leave(self, interaction: discord.Interaction):
-        conn = get_db(); cur = conn.cursor()
-        cur.execute("UPDATE participants SET active=0 WHERE user_id=?", (interaction.user.id,))
-        conn.commit(); conn.close()
+        await repo.leave(interaction.user.id)
         await interaction.response.send_message(
             f"👋 {interaction.user.mention} left the Loser Challenge.", ephemeral=True
         )
 
     @app_commands.command(name="skipweek", description="Opt out for this week only.")
     async def skipweek(self, interaction: discord.Interaction):
-        conn = get_db(); cur = conn.cursor()
-        cur.execute("DELETE FROM participants WHERE user_id=?", (interaction.user.id,))
-        conn.commit(); conn.close()
+        await repo.skip_week(interaction.user.id)
         await interaction.response.send_message(
             f"⏸️ {interaction.user.mention} is skipping this week.", ephemeral=True
         )
@@ -105,11 +95,10 @@ class AdminCog(commands.Cog):
         p = Path(LOSER_DATA_PATH)
         p.parent.mkdir(parents=True, exist_ok=True)
         backup_name = p.parent / f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-        try:
-            shutil.copy(p, backup_name)
-        except FileNotFoundError:
+        if not p.exists():
             await interaction.response.send_message("❌ DB file not found.", ephemeral=True)
             return
+        await repo.snapshot(backup_name)   # backup API, so commits still in the WAL are included
         await interaction.response.send_message(f"💾 Backup saved: `{backup_name.name}`", ephemeral=True)
 
     @app_commands.command(name="listbackups", description="List available DB backups.")
@@ -144,8 +133,8 @@ class AdminCog(commands.Cog):
 
         try:
             if cur_db.exists():
-                shutil.copy(cur_db, safety)  # safety copy of current DB
-            shutil.copy(src, cur_db)         # restore selected backup
+                await repo.snapshot(safety)  # safety copy of current DB
+            await repo.restore(src, cur_db)  # restore selected backup once queued writes have landed
         except Exception as e:
             await interaction.response.send_message(f"❌ Restore failed: {e}", ephemeral=True)
             return
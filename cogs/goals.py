@@ -1,12 +1,12 @@
 # cogs/goals.py — discord.py 2.x (app_commands) version
 from typing import Optional, Literal
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import pytz
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database import get_db
+from repository import repo
 from config import TIMEZONE
 
 tz = pytz.timezone(TIMEZONE)
@@ -15,9 +15,6 @@ def week_start():
     now = datetime.now(tz)
     return (now - timedelta(days=now.weekday())).date()
 
-def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds")
-
 class GoalsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -62,21 +59,15 @@ class GoalsCog(commands.Cog):
         unit: Optional[str] = None,
     ):
         uid = interaction.user.id
-        conn = get_db(); cur = conn.cursor()
-
         # ---- LIST ----
         if action.value == "list":
-            rows = cur.execute(
-                "SELECT name, type, target, log_style, COALESCE(unit,'') AS unit "
-                "FROM goals_default WHERE user_id=? ORDER BY name",
-                (uid,)
-            ).fetchall()
+            rows = await repo.list_goals(uid)
 
             if not rows:
                 await interaction.response.send_message(
                     "You have no default goals set.", ephemeral=True
                 )
-                conn.close(); return
+                return
 
             lines = ["**Your default goals:**"]
             for r in rows:
@@ -95,7 +86,7 @@ class GoalsCog(commands.Cog):
                     )
 
             await interaction.response.send_message("\n".join(lines), ephemeral=True)
-            conn.close(); return
+            return
 
         # ---- REMOVE ----
         if action.value == "remove":
@@ -104,18 +95,14 @@ class GoalsCog(commands.Cog):
                     "❌ You must provide `name` to remove a goal.",
                     ephemeral=True
                 )
-                conn.close(); return
+                return
 
-            cur.execute(
-                "DELETE FROM goals_default WHERE user_id=? AND name=?",
-                (uid, name)
-            )
-            conn.commit()
+            await repo.remove_goal(uid, name)
             await interaction.response.send_message(
                 f"🗑️ Removed default goal `{name}` (if it existed).",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         # ---- ADD / UPDATE ----
         if action.value == "add":
@@ -124,32 +111,28 @@ class GoalsCog(commands.Cog):
                     "❌ You must provide `name` when adding a goal.",
                     ephemeral=True
                 )
-                conn.close(); return
+                return
 
             if not goal_type:
                 await interaction.response.send_message(
                     "❌ You must choose `goal_type` (count or boolean) when adding a goal.",
                     ephemeral=True
                 )
-                conn.close(); return
+                return
 
             gtype = goal_type.value  # 'count' | 'boolean'
 
             # BOOLEAN GOALS: force weekly_final and ignore target/log_style/unit
             if gtype == "boolean":
                 # We can store target NULL or 1; it doesn't matter for behavior.
-                cur.execute("""
-                    INSERT OR REPLACE INTO goals_default (user_id, name, type, target, log_style, unit)
-                    VALUES (?, ?, 'boolean', NULL, 'weekly_final', NULL)
-                """, (uid, name))
-                conn.commit()
+                await repo.save_goal(uid, name, "boolean", None, "weekly_final", None)
                 await interaction.response.send_message(
                     f"✅ Saved boolean goal `{name}`.\n"
                     f"• Use `/complete name:{name}` to mark it done each week.\n"
                     f"• Use `/undo name:{name}` to reverse it.",
                     ephemeral=True
                 )
-                conn.close(); return
+                return
 
             # COUNT GOALS
             if gtype == "count":
@@ -158,7 +141,7 @@ class GoalsCog(commands.Cog):
                         "❌ Count goals need a positive `target` (e.g., 3, 5, 7).",
                         ephemeral=True
                     )
-                    conn.close(); return
+                    return
 
                 # Determine style: default to incremental if none provided
                 style_value = log_style.value if log_style else "incremental"
@@ -167,15 +150,11 @@ class GoalsCog(commands.Cog):
                         "❌ Invalid log_style for count goal. Choose incremental or weekly_final.",
                         ephemeral=True
                     )
-                    conn.close(); return
+                    return
 
                 unit_value = unit.strip() if unit else None
 
-                cur.execute("""
-                    INSERT OR REPLACE INTO goals_default (user_id, name, type, target, log_style, unit)
-                    VALUES (?, ?, 'count', ?, ?, ?)
-                """, (uid, name, target, style_value, unit_value))
-                conn.commit()
+                await repo.save_goal(uid, name, "count", target, style_value, unit_value)
 
                 if style_value == "incremental":
                     text = (
@@ -191,13 +170,12 @@ class GoalsCog(commands.Cog):
                     )
 
                 await interaction.response.send_message(text, ephemeral=True)
-                conn.close(); return
+                return
 
         # If something weird slips through:
         await interaction.response.send_message(
             "❌ Unsupported `action` for /setdefault.", ephemeral=True
         )
-        conn.close()
 
     # ---------- Weekly override (simple) ----------
     @app_commands.command(name="setweek", description="Override one of your goals for this week only.")
@@ -213,16 +191,11 @@ class GoalsCog(commands.Cog):
         target: Optional[int] = None,
         log_style: Optional[Literal["incremental", "weekly_final"]] = None
     ):
-        conn = get_db(); cur = conn.cursor()
         uid = interaction.user.id
-        g = cur.execute("SELECT * FROM goals_default WHERE user_id=? AND name=?", (uid, name.lower())).fetchone()
+        g = await repo.override_goal(uid, name, target, log_style)
         if not g:
             await interaction.response.send_message("❌ You don't have a goal by that name.", ephemeral=True)
-            conn.close(); return
-        cur.execute("""
-            UPDATE goals_default SET target=?, log_style=? WHERE user_id=? AND name=?
-        """, (target or g["target"], (log_style or g["log_style"]), uid, name.lower()))
-        conn.commit(); conn.close()
+            return
         await interaction.response.send_message(
             f"✅ This week: `{name}` → target={target or g['target']}, style={log_style or g['log_style']}",
             ephemeral=True
@@ -250,21 +223,15 @@ class GoalsCog(commands.Cog):
     ):
         uid = interaction.user.id
         w = str(week_start())
-        conn = get_db(); cur = conn.cursor()
-
         # Look up goal definition
-        g = cur.execute(
-            "SELECT name, type, target, log_style, COALESCE(unit,'') AS unit "
-            "FROM goals_default WHERE user_id=? AND name=?",
-            (uid, name)
-        ).fetchone()
+        g = await repo.get_goal(uid, name)
 
         if not g:
             await interaction.response.send_message(
                 f"❌ Goal `{name}` not found. Use `/setdefault action:list`.",
                 ephemeral=True  # keep errors private
             )
-            conn.close(); return
+            return
 
         goal_name = g["name"]
         gtype     = g["type"]            # 'count' | 'boolean'
@@ -279,15 +246,15 @@ class GoalsCog(commands.Cog):
                 f"ℹ️ `{goal_name}` is a boolean goal. Use `/complete name:{goal_name}` (or `/undo`).",
                 ephemeral=True
             )
-            conn.close(); return
-        
+            return
+
         # Weekly-final count goals: use /final instead
         if gtype == "count" and style == "weekly_final":
             await interaction.response.send_message(
                 f"ℹ️ `{goal_name}` is a weekly-final goal. Use `/final name:{goal_name} value:<number>`.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         # COUNT + INCREMENTAL
         if gtype == "count" and style == "incremental":
@@ -296,51 +263,26 @@ class GoalsCog(commands.Cog):
                     "❌ Incremental goal needs `amount` (add) or `set_to` (overwrite total).",
                     ephemeral=True
                 )
-                conn.close(); return
-
-            # current total
-            r = cur.execute(
-                "SELECT value_total FROM progress WHERE user_id=? AND week_start=? AND name=?",
-                (uid, w, goal_name)
-            ).fetchone()
-            current = r["value_total"] if r else 0
+                return
 
+            # read-modify-write happens in one transaction on the DB thread
             if set_to is not None:
-                new_total = max(0, int(set_to))
-                cur.execute("""
-                    INSERT OR REPLACE INTO progress (user_id, week_start, name, value_total)
-                    VALUES (?, ?, ?, ?)
-                """, (uid, w, goal_name, new_total))
-                cur.execute("""
-                    INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
-                    VALUES (?, ?, ?, 'incremental', NULL, ?, ?, ?)
-                """, (uid, w, goal_name, new_total, note, _utc_now_iso()))
-                conn.commit()
+                new_total = await repo.log_incremental(uid, w, goal_name, set_to=set_to, note=note)
                 msg = (f"**{interaction.user.display_name}** set `{goal_name}` → "
                     f"**{new_total}/{target}**{unit_sfx} (incremental).")
             else:
                 add = int(amount) # type: ignore
-                new_total = max(0, current + add)
-                cur.execute("""
-                    INSERT OR REPLACE INTO progress (user_id, week_start, name, value_total)
-                    VALUES (?, ?, ?, ?)
-                """, (uid, w, goal_name, new_total))
-                cur.execute("""
-                    INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
-                    VALUES (?, ?, ?, 'incremental', ?, NULL, ?, ?)
-                """, (uid, w, goal_name, add, note, _utc_now_iso()))
-                conn.commit()
+                new_total = await repo.log_incremental(uid, w, goal_name, add=add, note=note)
                 msg = (f"**{interaction.user.display_name}** updated `{goal_name}`: +{add} → "
                     f"**{new_total}/{target}**{unit_sfx} (incremental).")
 
             if note:
                 msg += f"  _{note}_"
             await interaction.response.send_message(msg)  # PUBLIC
-            conn.close(); return
+            return
 
         # fallback
         await interaction.response.send_message("❌ Unsupported goal configuration.", ephemeral=True)
-        conn.close()
 
     @app_commands.command(
         name="final",
@@ -360,20 +302,14 @@ class GoalsCog(commands.Cog):
     ):
         uid = interaction.user.id
         w = str(week_start())
-        conn = get_db(); cur = conn.cursor()
-
-        g = cur.execute(
-            "SELECT name, type, target, log_style, COALESCE(unit,'') AS unit "
-            "FROM goals_default WHERE user_id=? AND name=?",
-            (uid, name)
-        ).fetchone()
+        g = await repo.get_goal(uid, name)
 
         if not g:
             await interaction.response.send_message(
                 f"❌ Goal `{name}` not found. Use `/setdefault action:list`.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         goal_name = g["name"]
         gtype     = g["type"]          # 'count' | 'boolean'
@@ -387,7 +323,7 @@ class GoalsCog(commands.Cog):
                 f"ℹ️ `{goal_name}` is not a count goal. Use `/complete` for boolean goals.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         if style != "weekly_final":
             await interaction.response.send_message(
@@ -395,22 +331,11 @@ class GoalsCog(commands.Cog):
                 f"Use `/loser` for incremental updates instead.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         final_val = max(0, int(value))
 
-        cur.execute("""
-            INSERT OR REPLACE INTO finals (user_id, week_start, name, value)
-            VALUES (?, ?, ?, ?)
-        """, (uid, w, goal_name, final_val))
-
-        cur.execute("""
-            INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
-            VALUES (?, ?, ?, 'weekly_final', NULL, ?, ?, ?)
-        """, (uid, w, goal_name, final_val, note, _utc_now_iso()))
-
-        conn.commit()
-        conn.close()
+        await repo.set_final(uid, w, goal_name, final_val, note)
 
         msg = (
             f"**{interaction.user.display_name}** set weekly-final `{goal_name}` = "
@@ -438,19 +363,14 @@ class GoalsCog(commands.Cog):
     ):
         uid = interaction.user.id
         w = str(week_start())
-        conn = get_db(); cur = conn.cursor()
-
-        g = cur.execute(
-            "SELECT name, type, log_style FROM goals_default WHERE user_id=? AND name=?",
-            (uid, name)
-        ).fetchone()
+        g = await repo.get_goal(uid, name)
 
         if not g:
             await interaction.response.send_message(
                 f"❌ Goal `{name}` not found. Use `/setdefault action:list`.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         goal_name = g["name"]
         gtype     = g["type"]
@@ -460,21 +380,10 @@ class GoalsCog(commands.Cog):
                 f"ℹ️ `{goal_name}` is not a boolean goal. Use `/loser` or `/final` for count goals.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         # mark as done
-        cur.execute("""
-            INSERT OR REPLACE INTO booleans (user_id, week_start, name, done)
-            VALUES (?, ?, ?, 1)
-        """, (uid, w, goal_name))
-
-        cur.execute("""
-            INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
-            VALUES (?, ?, ?, 'boolean', NULL, 1, ?, ?)
-        """, (uid, w, goal_name, note, _utc_now_iso()))
-
-        conn.commit()
-        conn.close()
+        await repo.set_done(uid, w, goal_name, True, note)
 
         msg = f"**{interaction.user.display_name}** completed boolean goal `{goal_name}` ✅."
         if note:
@@ -498,19 +407,14 @@ class GoalsCog(commands.Cog):
     ):
         uid = interaction.user.id
         w = str(week_start())
-        conn = get_db(); cur = conn.cursor()
-
-        g = cur.execute(
-            "SELECT name, type FROM goals_default WHERE user_id=? AND name=?",
-            (uid, name)
-        ).fetchone()
+        g = await repo.get_goal(uid, name)
 
         if not g:
             await interaction.response.send_message(
                 f"❌ Goal `{name}` not found. Use `/setdefault action:list`.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         goal_name = g["name"]
         gtype     = g["type"]
@@ -520,21 +424,10 @@ class GoalsCog(commands.Cog):
                 f"ℹ️ `{goal_name}` is not a boolean goal. `/undo` only applies to boolean goals.",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         # delete completion
-        cur.execute("""
-            DELETE FROM booleans
-            WHERE user_id=? AND week_start=? AND name=?
-        """, (uid, w, goal_name))
-
-        cur.execute("""
-            INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
-            VALUES (?, ?, ?, 'undo', NULL, NULL, NULL, ?)
-        """, (uid, w, goal_name, _utc_now_iso()))
-
-        conn.commit()
-        conn.close()
+        await repo.set_done(uid, w, goal_name, False)
 
         # PUBLIC
         await interaction.response.send_message(
@@ -546,65 +439,28 @@ class GoalsCog(commands.Cog):
 
     @app_commands.command(name="me", description="Show your goals and current progress for this week.")
     async def me(self, interaction: discord.Interaction):
-        conn = get_db(); cur = conn.cursor()
         uid = interaction.user.id; w = str(week_start())
 
-        goals = cur.execute("SELECT * FROM goals_default WHERE user_id=?", (uid,)).fetchall()
+        goals = await repo.my_week(uid, w)
         if not goals:
             await interaction.response.send_message(
                 "You have no goals set. Use `/setdefault action:add ...`",
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         lines = [f"**Your Goals – Week of {w}**"]
-        for g in goals:
+        for g, val, note in goals:
+            suffix = f" _(Last note: {note})_" if note else ""
             if g["type"] == "count":
                 if g["log_style"] == "incremental":
-                    r = cur.execute("SELECT value_total FROM progress WHERE user_id=? AND week_start=? AND name=?", (uid, w, g["name"])).fetchone()
-                    val = r["value_total"] if r else 0
-
-                    # ✅ Fetch last note (incremental)
-                    rnote = cur.execute("""
-                        SELECT note FROM logs
-                        WHERE user_id=? AND week_start=? AND name=? AND note IS NOT NULL AND note <> ''
-                        ORDER BY id DESC LIMIT 1
-                    """, (uid, w, g["name"].lower())).fetchone()
-                    suffix = f" _(Last note: {rnote['note']})_" if rnote else ""
-
                     lines.append(f"• {g['name']} – {val}/{g['target']} (incremental){suffix}")
-
                 else:
-                    r = cur.execute("SELECT value FROM finals WHERE user_id=? AND week_start=? AND name=?", (uid, w, g["name"])).fetchone()
-                    val = r["value"] if r else 0
-
-                    # ✅ Fetch last note (final)
-                    rnote = cur.execute("""
-                        SELECT note FROM logs
-                        WHERE user_id=? AND week_start=? AND name=? AND note IS NOT NULL AND note <> ''
-                        ORDER BY id DESC LIMIT 1
-                    """, (uid, w, g["name"].lower())).fetchone()
-                    suffix = f" _(Last note: {rnote['note']})_" if rnote else ""
-
                     lines.append(f"• {g['name']} – final: {val}/{g['target']}{suffix}")
-
             else:
-                r = cur.execute("SELECT done FROM booleans WHERE user_id=? AND week_start=? AND name=?", (uid, w, g["name"])).fetchone()
-                done = bool(r and r["done"])
-
-                # ✅ Fetch last note (boolean)
-                rnote = cur.execute("""
-                    SELECT note FROM logs
-                    WHERE user_id=? AND week_start=? AND name=? AND note IS NOT NULL AND note <> ''
-                    ORDER BY id DESC LIMIT 1
-                """, (uid, w, g["name"].lower())).fetchone()
-                suffix = f" _(Last note: {rnote['note']})_" if rnote else ""
-
-                lines.append(f"• {g['name']} – {'✅' if done else '❌'}{suffix}")
-
+                lines.append(f"• {g['name']} – {'✅' if val else '❌'}{suffix}")
 
         await interaction.response.send_message("\n".join(lines), ephemeral=True)
-        conn.close()
 
     @app_commands.command(name="history", description="Show your log history for this week (with notes).")
     @app_commands.describe(
@@ -612,34 +468,18 @@ class GoalsCog(commands.Cog):
         limit="Max entries to show (default 10, max 50)"
     )
     async def history(self, interaction: discord.Interaction, name: Optional[str] = None, limit: Optional[int] = 10):
-        conn = get_db(); cur = conn.cursor()
         uid = interaction.user.id
         w = str(week_start())
         lim = max(1, min(limit or 10, 50))
 
-        if name:
-            rows = cur.execute("""
-                SELECT name, kind, delta, set_to, note, ts_utc
-                FROM logs
-                WHERE user_id=? AND week_start=? AND name=?
-                ORDER BY id DESC
-                LIMIT ?
-            """, (uid, w, name.lower(), lim)).fetchall()
-        else:
-            rows = cur.execute("""
-                SELECT name, kind, delta, set_to, note, ts_utc
-                FROM logs
-                WHERE user_id=? AND week_start=?
-                ORDER BY id DESC
-                LIMIT ?
-            """, (uid, w, lim)).fetchall()
+        rows = await repo.history(uid, w, name, lim)
 
         if not rows:
             await interaction.response.send_message(
                 "No history yet for this week." + (f" (goal: `{name}`)" if name else ""),
                 ephemeral=True
             )
-            conn.close(); return
+            return
 
         # Build a compact list
         lines = []
@@ -661,7 +501,7 @@ class GoalsCog(commands.Cog):
 
         # Reply (ephemeral to avoid channel spam)
         await interaction.response.send_message("\n".join(lines), ephemeral=True)
-        conn.close()    
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(GoalsCog(bot))
@@ -6,7 +6,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database import get_db
+from repository import repo
 from config import TIMEZONE
 
 tz = pytz.timezone(TIMEZONE)
@@ -87,16 +87,12 @@ class SummaryCog(commands.Cog):
 
     @app_commands.command(name="summary", description="Show the team progress for this week.")
     async def summary(self, interaction: discord.Interaction):
-        conn = get_db(); cur = conn.cursor()
         w = str(week_start())
+        streak, best = await repo.team_stats()
 
-        ts = cur.execute("SELECT streak, best_streak FROM team_stats WHERE id=1").fetchone()
-        streak, best = (ts["streak"], ts["best_streak"]) if ts else (0, 0)
-
-        participants = cur.execute("SELECT * FROM participants WHERE active=1").fetchall()
-        if not participants:
+        rows = await repo.weekly_status(w)
+        if not rows:
             await interaction.response.send_message("No active participants.", ephemeral=True)
-            conn.close()
             return
 
         lines: List[str] = [
@@ -109,78 +105,47 @@ class SummaryCog(commands.Cog):
         team_current = 0  # sum of all current “units”
         team_target = 0   # sum of all targets
 
-        for p in participants:
-            uid = p["user_id"]
-            goals = cur.execute("SELECT * FROM goals_default WHERE user_id=?", (uid,)).fetchall()
-            if not goals:
+        # rows come grouped by participant, one per goal
+        by_user: dict = {}
+        for g in rows:
+            by_user.setdefault(g["user_id"], []).append(g)
+
+        for uid, goals in by_user.items():
+            if goals[0]["name"] is None:
                 lines.append(f"<@{uid}>: No goals set ❌")
                 team_risk = True
                 continue
 
             parts: List[str] = []
             for g in goals:
+                val = g["value"]
+                complete = g["complete"]
                 if g["type"] == "count":
-                    if g["log_style"] == "incremental":
-                        r = cur.execute(
-                            "SELECT value_total FROM progress WHERE user_id=? AND week_start=? AND name=?",
-                            (uid, w, g["name"])
-                        ).fetchone()
-                        val = r["value_total"] if r else 0
+                    unit = (g["unit"] or "").strip()
+                    unit_suffix = f" {unit}" if unit else ""
 
-                        unit = (g["unit"] or "").strip() if "unit" in g.keys() else ""
-                        unit_suffix = f" {unit}" if unit else ""
-
-                        complete = val >= g["target"]
+                    if g["log_style"] == "incremental":
                         text = f"{g['name']} {val}/{g['target']}{unit_suffix}"
-                        if complete:
-                            text += " ✅"
-
-                        parts.append(text)
-
-                        # team totals
-                        team_current += min(val, g["target"])
-                        team_target += g["target"] or 0
-
-                        if not complete:
-                            team_risk = True
                     else:
-                        r = cur.execute(
-                            "SELECT value FROM finals WHERE user_id=? AND week_start=? AND name=?",
-                            (uid, w, g["name"])
-                        ).fetchone()
-                        val = r["value"] if r else 0
-
-                        unit = (g["unit"] or "").strip() if "unit" in g.keys() else ""
-                        unit_suffix = f" {unit}" if unit else ""
-
-                        complete = val >= g["target"]
                         text = f"{g['name']} final: {val}/{g['target']}{unit_suffix}"
-                        if complete:
-                            text += " ✅"
-
-                        parts.append(text)
+                    if complete:
+                        text += " ✅"
 
-                        # team totals
-                        team_current += min(val, g["target"])
-                        team_target += g["target"] or 0
+                    parts.append(text)
 
-                        if not complete:
-                            team_risk = True
+                    # team totals
+                    team_current += min(val, g["target"])
+                    team_target += g["target"] or 0
                 else:
-                    r = cur.execute(
-                        "SELECT done FROM booleans WHERE user_id=? AND week_start=? AND name=?",
-                        (uid, w, g["name"])
-                    ).fetchone()
-                    ok = bool(r and r["done"])
-                    parts.append(f"{g['name']} {'✅' if ok else '❌'}")
+                    parts.append(f"{g['name']} {'✅' if complete else '❌'}")
 
                     # booleans are 1/1 if done, 0/1 if not
                     team_target += 1
-                    if ok:
+                    if complete:
                         team_current += 1
-                    else:
-                        team_risk = True
 
+                if not complete:
+                    team_risk = True
 
             lines.append(f"<@{uid}>: " + " | ".join(parts))
 
@@ -201,7 +166,6 @@ class SummaryCog(commands.Cog):
         lines.append(pick_humor_footer(progress_pct, remaining_units, team_risk))
 
         await interaction.response.send_message("\n".join(lines))
-        conn.close()
 
     @app_commands.command(name="guide", description="Show Loser Challenge guide")
     async def guide(self, interaction: discord.Interaction):
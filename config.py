@@ -24,4 +24,7 @@ CHALLENGE_CHANNEL_ID = _int_env("CHALLENGE_CHANNEL_ID", 0)
 LOSER_ROLE_ID        = _int_env("LOSER_ROLE_ID", 0)
 LOSER_DATA_PATH        = os.getenv("LOSER_DATA_PATH", "/data/loser_data.db")
 WORDLE_BOT_TOKEN     = os.getenv("WORDLE_BOT_TOKEN", "")
-WORDLE_DATA_PATH     = os.getenv("WORDLE_DATA_PATH", "/data/wordle_scores.json")
\ No newline at end of file
+WORDLE_DATA_PATH     = os.getenv("WORDLE_DATA_PATH", "/data/wordle_scores.json")
+WORDLE_DB_PATH       = os.getenv("WORDLE_DB_PATH", "/data/wordle_scores.db")
+WORDLE_HOME_GUILD_ID = _int_env("WORDLE_HOME_GUILD_ID", 0)   # guild that owns WORDLE_DB_PATH / legacy JSON
+WORDLE_LEADERBOARD_WINDOW = _int_env("WORDLE_LEADERBOARD_WINDOW", 20)  # seconds to batch submissions
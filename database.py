@@ -1,15 +1,83 @@
+import logging
+import queue
 import sqlite3
+from contextlib import contextmanager
 from config import LOSER_DATA_PATH
 
+# Applied to every pooled connection. WAL lets readers run alongside the
+# writer; synchronous=NORMAL is durable across app crashes in WAL mode and
+# only fsyncs at checkpoints.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",        # KiB, i.e. ~16 MB page cache per connection
+    "PRAGMA mmap_size = 67108864",       # 64 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+)
+
+class ConnectionPool:
+    """
+    Long-lived SQLite connections, handed out with `with pool.connection() as conn:`.
+
+    Connections are opened once (pragmas applied), reused LIFO so the warm
+    ones stay hot, and never block a caller: if all are checked out a new
+    one is opened, and extras beyond `size` are closed on return. Leaving
+    the block commits, or rolls back if it raised, so no path can leak a
+    connection or an open transaction.
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread off: a connection may be returned by one thread and reused by another
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if self._idle.qsize() < self.size:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        """Close idle connections; the last close checkpoints and removes the -wal file."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+log = logging.getLogger(__name__)
+
+pool = ConnectionPool(LOSER_DATA_PATH)
+
 def get_db():
-    conn = sqlite3.connect(LOSER_DATA_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Pooled connection as a context manager: `with get_db() as conn: ...`."""
+    return pool.connection()
 
-def init_db():
-    conn = get_db()
-    cur = conn.cursor()
-    cur.executescript("""
+# Ordered schema migrations; PRAGMA user_version records how many have run.
+# Append new steps, never edit applied ones. The first is the original
+# IF NOT EXISTS script, so databases created before versioning adopt it as-is.
+MIGRATIONS = [
+    """
     CREATE TABLE IF NOT EXISTS participants (
         user_id INTEGER PRIMARY KEY,
         username TEXT,
@@ -55,7 +123,7 @@ def init_db():
         team_result TEXT,       -- 'WIN' | 'FAIL'
         failed_members TEXT
     );
-                      
+
     CREATE TABLE IF NOT EXISTS logs (
         id         INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id    INTEGER NOT NULL,
@@ -67,7 +135,7 @@ def init_db():
         note       TEXT,
         ts_utc     TEXT    NOT NULL  -- ISO timestamp in UTC
     );
-                  
+
     -- Single-row table for team streak
     CREATE TABLE IF NOT EXISTS team_stats (
         id INTEGER PRIMARY KEY CHECK (id = 1),
@@ -75,6 +143,29 @@ def init_db():
         best_streak INTEGER DEFAULT 0
     );
     INSERT OR IGNORE INTO team_stats (id, streak, best_streak) VALUES (1, 0, 0);
-    """)
-    conn.commit()
-    conn.close()
+    """,
+
+    # /history and /me: logs filtered by user-week(-goal), newest first. The
+    # explicit `id DESC` lets the latest-note window read each goal in order,
+    # and both indexes carry every column those queries read, so they never
+    # touch the table. Logs are a few rows per user-week, so the extra copy is
+    # cheap. progress/finals/booleans are only ever hit on their full primary key.
+    """
+    CREATE INDEX IF NOT EXISTS idx_logs_user_week_name ON logs
+        (user_id, week_start, name, id DESC, kind, delta, set_to, note, ts_utc);
+    CREATE INDEX IF NOT EXISTS idx_logs_user_week ON logs
+        (user_id, week_start, id DESC, name, kind, delta, set_to, note, ts_utc);
+    """,
+]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending MIGRATIONS, each in its own transaction; returns the schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+        log.info("Loser DB migrated to schema v%d", number)
+    return max(version, len(MIGRATIONS))
+
+def init_db():
+    with get_db() as conn:
+        migrate(conn)
@@ -0,0 +1,34 @@
+# db_batch.py
+import sqlite3
+from typing import Any, Callable, Iterable
+
+
+def commit_units(conn: sqlite3.Connection, units: Iterable, run: Callable[[sqlite3.Connection, Any], Any]):
+    """
+    Apply many independent write units in one transaction and return a
+    (result, error) pair for each.
+
+    Each unit runs as run(conn, unit) inside its own SAVEPOINT, so a unit that
+    raises is rolled back alone and the rest still commit. The outer BEGIN
+    keeps RELEASE from committing each unit, so the whole batch costs one
+    commit. If BEGIN or COMMIT itself fails, everything is rolled back and the
+    error is raised: nothing was written.
+    """
+    results: list[tuple[Any, Exception | None]] = []
+    conn.execute("BEGIN")
+    try:
+        for unit in units:
+            conn.execute("SAVEPOINT unit")
+            try:
+                out = run(conn, unit)
+            except Exception as e:
+                conn.execute("ROLLBACK TO unit")
+                results.append((None, e))
+            else:
+                results.append((out, None))
+            conn.execute("RELEASE unit")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return results
@@ -0,0 +1,390 @@
+# repository.py
+import asyncio
+import logging
+import queue
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple
+
+from database import ConnectionPool, init_db, pool as default_pool
+from db_batch import commit_units
+
+log = logging.getLogger(__name__)
+
+
+class _Job(NamedTuple):
+    fn: Callable
+    args: tuple
+    write: bool | None      # None: runs without a connection (file work)
+    future: Future
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# Every active participant's goals with this week's value, in one pass: the
+# value comes from whichever table the goal's type/style logs to. Ordered like
+# the old per-participant loops (participants by id, goals by name).
+WEEKLY_STATUS_SQL = """
+    SELECT p.user_id, g.name, g.type, g.target, g.log_style, g.unit,
+           CASE
+               WHEN g.type = 'count' AND g.log_style = 'incremental' THEN COALESCE(pr.value_total, 0)
+               WHEN g.type = 'count' THEN COALESCE(f.value, 0)
+               ELSE COALESCE(b.done, 0)
+           END AS value,
+           CASE
+               WHEN g.name IS NULL THEN 0
+               WHEN g.type = 'count' AND g.log_style = 'incremental' THEN COALESCE(pr.value_total, 0) >= g.target
+               WHEN g.type = 'count' THEN COALESCE(f.value, 0) >= g.target
+               ELSE COALESCE(b.done, 0) <> 0
+           END AS complete
+    FROM participants p
+    LEFT JOIN goals_default g ON g.user_id = p.user_id
+    LEFT JOIN progress pr ON pr.user_id = g.user_id AND pr.week_start = ? AND pr.name = g.name
+    LEFT JOIN finals   f  ON f.user_id  = g.user_id AND f.week_start  = ? AND f.name  = g.name
+    LEFT JOIN booleans b  ON b.user_id  = g.user_id AND b.week_start  = ? AND b.name  = g.name
+    WHERE p.active = 1
+    ORDER BY p.user_id, g.name
+"""
+
+# One user's goals with this week's value (same value rule as above).
+MY_WEEK_SQL = """
+    SELECT g.*,
+           CASE
+               WHEN g.type = 'count' AND g.log_style = 'incremental' THEN COALESCE(pr.value_total, 0)
+               WHEN g.type = 'count' THEN COALESCE(f.value, 0)
+               ELSE COALESCE(b.done, 0)
+           END AS value
+    FROM goals_default g
+    LEFT JOIN progress pr ON pr.user_id = g.user_id AND pr.week_start = ? AND pr.name = g.name
+    LEFT JOIN finals   f  ON f.user_id  = g.user_id AND f.week_start  = ? AND f.name  = g.name
+    LEFT JOIN booleans b  ON b.user_id  = g.user_id AND b.week_start  = ? AND b.name  = g.name
+    WHERE g.user_id = ?
+    ORDER BY g.name
+"""
+
+# (name, note) of the newest non-empty note per goal for one user-week.
+LAST_NOTES_SQL = """
+    SELECT name, note FROM (
+        SELECT name, note, ROW_NUMBER() OVER (PARTITION BY name ORDER BY id DESC) AS rn
+        FROM logs
+        WHERE user_id = ? AND week_start = ? AND note IS NOT NULL AND note <> ''
+    )
+    WHERE rn = 1
+"""
+
+HISTORY_SQL = """
+    SELECT name, kind, delta, set_to, note, ts_utc
+    FROM logs
+    WHERE user_id = ? AND week_start = ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+HISTORY_BY_NAME_SQL = """
+    SELECT name, kind, delta, set_to, note, ts_utc
+    FROM logs
+    WHERE user_id = ? AND week_start = ? AND name = ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+
+class LoserRepository:
+    """
+    Async access to the Loser Challenge tables.
+
+    Writes run on one dedicated thread, so the event loop both bots share
+    never waits on SQLite or an fsync; callers just await the result. The
+    thread drains its queue and runs each run of consecutive writes in a
+    single transaction (one SAVEPOINT per job, so a failing job is rolled
+    back alone), which turns a burst of /loser logs into one commit.
+
+    Reads go to a few reader threads on their own pooled connections: WAL
+    lets them see the last commit while a write is in progress, so /summary
+    and /me never queue behind a burst of writes. A read issued after an
+    awaited write sees it; restore() waits for in-flight reads and holds new
+    ones until the file is swapped.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._queue: queue.Queue = queue.Queue()
+        # the writer keeps one pooled connection, the readers share the rest
+        self._readers = max(1, pool.size - 1)
+        self._reader_pool = ThreadPoolExecutor(self._readers, thread_name_prefix="loser-read")
+        self._read_gate = threading.BoundedSemaphore(self._readers)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.writes = 0
+
+    # ---------- plumbing ----------
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="loser-db", daemon=True)
+                self._thread.start()
+
+    def _submit(self, fn: Callable, args: tuple, write: bool | None):
+        self._ensure_thread()
+        fut: Future = Future()
+        self._queue.put(_Job(fn, args, write, fut))
+        return asyncio.wrap_future(fut)
+
+    def read(self, fn: Callable, *args):
+        """Await fn(conn, *args) on a reader thread, alongside any queued writes."""
+        fut: Future = Future()
+        self._reader_pool.submit(self._run_read, _Job(fn, args, False, fut))
+        return asyncio.wrap_future(fut)
+
+    def write(self, fn: Callable, *args):
+        """Await fn(conn, *args) on the writer thread, committed together with neighbouring writes."""
+        return self._submit(fn, args, True)
+
+    def run(self, fn: Callable, *args):
+        """Await fn(*args) on the writer thread, ordered with the writes but without a connection."""
+        return self._submit(fn, args, None)
+
+    def _worker(self):
+        while True:
+            jobs = [self._queue.get()]
+            while True:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            i = 0
+            while i < len(jobs):
+                j = i + 1
+                if jobs[i].write:
+                    while j < len(jobs) and jobs[j].write:
+                        j += 1
+                    self._run_writes(jobs[i:j])
+                else:
+                    self._run_raw(jobs[i])
+                i = j
+
+    def _run_read(self, job: _Job):
+        try:
+            with self._read_gate, self.pool.connection() as conn:
+                result = job.fn(conn, *job.args)
+        except BaseException as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+
+    def _run_raw(self, job: _Job):
+        try:
+            result = job.fn(*job.args)
+        except BaseException as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+
+    def _run_writes(self, jobs: list[_Job]):
+        try:
+            with self.pool.connection() as conn:
+                results = commit_units(conn, jobs, lambda conn, job: job.fn(conn, *job.args))
+        except Exception as e:
+            log.exception("Loser DB commit of %d writes failed", len(jobs))
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        self.commits += 1
+        self.writes += len(jobs)
+        for job, (out, err) in zip(jobs, results):
+            if err is None:
+                job.future.set_result(out)
+            else:
+                job.future.set_exception(err)
+
+    # ---------- schema / files ----------
+
+    def init(self):
+        return self.run(init_db)
+
+    def snapshot(self, dest):
+        """Consistent copy of the live database (WAL included) via the backup API."""
+        def _snapshot(conn, dest):
+            out = sqlite3.connect(dest)
+            try:
+                conn.backup(out)
+            finally:
+                out.close()
+        return self.read(_snapshot, dest)
+
+    def restore(self, src, dest):
+        """Copy `src` over the database file once everything queued before it is done."""
+        def _restore(src, dest):
+            # hold every read slot so no reader has a connection to the old file open
+            for _ in range(self._readers):
+                self._read_gate.acquire()
+            try:
+                # close pooled connections first so the old WAL is checkpointed and can't replay over the copy
+                self.pool.close()
+                shutil.copy(src, dest)
+            finally:
+                for _ in range(self._readers):
+                    self._read_gate.release()
+        return self.run(_restore, src, dest)
+
+    # ---------- participants ----------
+
+    def join(self, uid: int, username: str):
+        return self.write(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO participants (user_id, username, active) VALUES (?, ?, 1)",
+            (uid, username)))
+
+    def leave(self, uid: int):
+        return self.write(lambda conn: conn.execute(
+            "UPDATE participants SET active=0 WHERE user_id=?", (uid,)))
+
+    def skip_week(self, uid: int):
+        return self.write(lambda conn: conn.execute(
+            "DELETE FROM participants WHERE user_id=?", (uid,)))
+
+    def active_participants(self):
+        return self.read(lambda conn: conn.execute(
+            "SELECT * FROM participants WHERE active=1").fetchall())
+
+    # ---------- goals ----------
+
+    def list_goals(self, uid: int):
+        return self.read(lambda conn: conn.execute(
+            "SELECT name, type, target, log_style, COALESCE(unit,'') AS unit "
+            "FROM goals_default WHERE user_id=? ORDER BY name", (uid,)).fetchall())
+
+    def get_goal(self, uid: int, name: str):
+        return self.read(lambda conn: conn.execute(
+            "SELECT name, type, target, log_style, COALESCE(unit,'') AS unit "
+            "FROM goals_default WHERE user_id=? AND name=?", (uid, name)).fetchone())
+
+    def save_goal(self, uid: int, name: str, gtype: str, target, log_style: str, unit):
+        return self.write(lambda conn: conn.execute("""
+            INSERT OR REPLACE INTO goals_default (user_id, name, type, target, log_style, unit)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (uid, name, gtype, target, log_style, unit)))
+
+    def remove_goal(self, uid: int, name: str):
+        return self.write(lambda conn: conn.execute(
+            "DELETE FROM goals_default WHERE user_id=? AND name=?", (uid, name)))
+
+    def override_goal(self, uid: int, name: str, target, log_style):
+        """Change target/style of an existing goal; returns the old row or None."""
+        def _override(conn):
+            g = conn.execute("SELECT * FROM goals_default WHERE user_id=? AND name=?", (uid, name)).fetchone()
+            if g:
+                conn.execute("UPDATE goals_default SET target=?, log_style=? WHERE user_id=? AND name=?",
+                             (target or g["target"], log_style or g["log_style"], uid, name))
+            return g
+        return self.write(_override)
+
+    # ---------- weekly logging ----------
+
+    def log_incremental(self, uid: int, week: str, name: str, add=None, set_to=None, note=None):
+        """Add to (or overwrite) this week's running total and log it; returns the new total."""
+        def _log(conn):
+            r = conn.execute("SELECT value_total FROM progress WHERE user_id=? AND week_start=? AND name=?",
+                             (uid, week, name)).fetchone()
+            current = r["value_total"] if r else 0
+            new_total = max(0, int(set_to)) if set_to is not None else max(0, current + add)
+            conn.execute("""
+                INSERT OR REPLACE INTO progress (user_id, week_start, name, value_total)
+                VALUES (?, ?, ?, ?)
+            """, (uid, week, name, new_total))
+            conn.execute("""
+                INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
+                VALUES (?, ?, ?, 'incremental', ?, ?, ?, ?)
+            """, (uid, week, name, None if set_to is not None else add,
+                  new_total if set_to is not None else None, note, _utc_now_iso()))
+            return new_total
+        return self.write(_log)
+
+    def set_final(self, uid: int, week: str, name: str, value: int, note=None):
+        def _final(conn):
+            conn.execute("""
+                INSERT OR REPLACE INTO finals (user_id, week_start, name, value)
+                VALUES (?, ?, ?, ?)
+            """, (uid, week, name, value))
+            conn.execute("""
+                INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
+                VALUES (?, ?, ?, 'weekly_final', NULL, ?, ?, ?)
+            """, (uid, week, name, value, note, _utc_now_iso()))
+        return self.write(_final)
+
+    def set_done(self, uid: int, week: str, name: str, done: bool, note=None):
+        """Mark a boolean goal complete (logged as 'boolean') or undo it (logged as 'undo')."""
+        def _done(conn):
+            if done:
+                conn.execute("""
+                    INSERT OR REPLACE INTO booleans (user_id, week_start, name, done)
+                    VALUES (?, ?, ?, 1)
+                """, (uid, week, name))
+            else:
+                conn.execute("DELETE FROM booleans WHERE user_id=? AND week_start=? AND name=?",
+                             (uid, week, name))
+            conn.execute("""
+                INSERT INTO logs (user_id, week_start, name, kind, delta, set_to, note, ts_utc)
+                VALUES (?, ?, ?, ?, NULL, ?, ?, ?)
+            """, (uid, week, name, "boolean" if done else "undo", 1 if done else None,
+                  note if done else None, _utc_now_iso()))
+        return self.write(_done)
+
+    def history(self, uid: int, week: str, name=None, limit: int = 10):
+        def _history(conn):
+            if name:
+                return conn.execute(HISTORY_BY_NAME_SQL, (uid, week, name, limit)).fetchall()
+            return conn.execute(HISTORY_SQL, (uid, week, limit)).fetchall()
+        return self.read(_history)
+
+    # ---------- status ----------
+
+    def my_week(self, uid: int, week: str):
+        """(goal, value, last_note) for each of the user's goals; value is done (0/1) for booleans."""
+        def _mine(conn):
+            goals = conn.execute(MY_WEEK_SQL, (week, week, week, uid)).fetchall()
+            notes = dict(conn.execute(LAST_NOTES_SQL, (uid, week)).fetchall())
+            return [(g, g["value"], notes.get(g["name"])) for g in goals]
+        return self.read(_mine)
+
+    def weekly_status(self, week: str):
+        """
+        One row per (active participant, goal) for `week`: user_id, name, type,
+        target, log_style, unit, value, complete. Participants without goals
+        get a single row with name None.
+        """
+        def _status(conn):
+            return [{**dict(r), "complete": bool(r["complete"])}
+                    for r in conn.execute(WEEKLY_STATUS_SQL, (week, week, week)).fetchall()]
+        return self.read(_status)
+
+    def team_stats(self):
+        """(streak, best_streak)."""
+        def _stats(conn):
+            ts = conn.execute("SELECT streak, best_streak FROM team_stats WHERE id=1").fetchone()
+            return (ts["streak"], ts["best_streak"]) if ts else (0, 0)
+        return self.read(_stats)
+
+    def record_week(self, week: str, streak: int, best: int, team_result: str, failed: list):
+        def _record(conn):
+            conn.execute("UPDATE team_stats SET streak=?, best_streak=? WHERE id=1", (streak, best))
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                         (week, team_result, ", ".join(str(u) for u in failed)))
+        return self.write(_record)
+
+    def clear_week(self):
+        def _clear(conn):
+            conn.execute("DELETE FROM progress")
+            conn.execute("DELETE FROM finals")
+            conn.execute("DELETE FROM booleans")
+        return self.write(_clear)
+
+
+repo = LoserRepository(default_pool)
+
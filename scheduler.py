@@ -1,16 +1,25 @@
+import asyncio
 import random
 from pathlib import Path
-from shutil import copyfile
 from datetime import datetime, timedelta
 from typing import Optional, Union, cast
 import pytz
 import discord
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from database import get_db
+from repository import repo
 from config import TIMEZONE, CHALLENGE_CHANNEL_ID, LOSER_ROLE_ID, LOSER_DATA_PATH
 
 tz = pytz.timezone(TIMEZONE)
 
+# One APScheduler instance for both bots (they share an event loop in worker_main)
+job_scheduler = AsyncIOScheduler(timezone=tz)
+
+def ensure_scheduler_started():
+    # both bots call this from on_ready, which also re-fires on reconnects
+    if not job_scheduler.running:
+        job_scheduler.start()
+
 MessageableChan = Union[
     discord.TextChannel,
     discord.Thread,
@@ -43,14 +52,65 @@ def _resolve_message_channel(bot: discord.Client, channel_id: int) -> Optional[M
     # Category/Voice/Stage/Forum cannot .send()
     return None
 
+ROLE_CONCURRENCY = 5      # role edits in flight at once
+ROLE_RETRIES = 3          # extra attempts after a 429 discord.py gave up on
+
+async def _change_role(member: discord.Member, role: discord.Role, add: bool, reason: Optional[str]) -> bool:
+    """One add/remove, retried after a 429; prints and returns False on failure."""
+    verb = "add" if add else "remove"
+    for attempt in range(ROLE_RETRIES + 1):
+        try:
+            if add:
+                await member.add_roles(role, reason=reason)
+            else:
+                await member.remove_roles(role, reason=reason)
+            return True
+        except discord.Forbidden:
+            print(f"⚠️ Missing permissions to {verb} role for {member}")
+            return False
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == ROLE_RETRIES:
+                print(f"⚠️ {verb}_roles error for {member}: {e}")
+                return False
+            retry_after = float(e.response.headers.get("Retry-After", 2 ** attempt))
+            await asyncio.sleep(retry_after)
+        except Exception as e:
+            print(f"⚠️ {verb}_roles error for {member}: {e}")
+            return False
+    return False
+
+async def apply_role(members, role: discord.Role, add: bool, reason: Optional[str] = None,
+                     label: str = "role update") -> int:
+    """
+    Add or remove `role` for `members`, at most ROLE_CONCURRENCY requests at
+    a time (discord.py still paces each call by its rate-limit bucket).
+    Prints progress as it goes; returns how many changes succeeded.
+    """
+    members = list(members)
+    if not members:
+        return 0
+    sem = asyncio.Semaphore(ROLE_CONCURRENCY)
+    done = 0
+    step = max(1, len(members) // 4)
+
+    async def one(member):
+        nonlocal done
+        async with sem:
+            ok = await _change_role(member, role, add, reason)
+        done += 1
+        if done % step == 0 or done == len(members):
+            print(f"👥 {label}: {done}/{len(members)}")
+        return ok
+
+    results = await asyncio.gather(*(one(m) for m in members))
+    return sum(results)
+
 def week_start_date(dt=None):
     now = dt or datetime.now(tz)
     return (now - timedelta(days=now.weekday())).date()
 
 async def post_weekly_message(bot: discord.Client):
     channel = _resolve_message_channel(bot, CHALLENGE_CHANNEL_ID) # type: ignore
-    conn = get_db()
-    cur = conn.cursor()
 
     if channel is None:
         # Optionally log an error so you fix the channel id
@@ -58,73 +118,52 @@ async def post_weekly_message(bot: discord.Client):
         return
 
     # Fetch team streak
-    ts = cur.execute("SELECT streak FROM team_stats WHERE id=1").fetchone()
-    streak = ts["streak"] if ts else 0
+    streak, _ = await repo.team_stats()
 
-    participants = cur.execute("SELECT * FROM participants WHERE active=1").fetchall()
-    goals = cur.execute("SELECT * FROM goals_default").fetchall()
+    rows = await repo.weekly_status(str(week_start_date()))
 
     header = f"Week of {datetime.now(tz).strftime('%m/%d')} — @LOSER Challenge (Team Mode)\n"
     header += f"🏆 Current Team Streak: {streak} week{'s' if streak != 1 else ''}\n\n"
+    by_user: dict = {}
+    for g in rows:
+        by_user.setdefault(g["user_id"], []).append(g)
     body = ""
-    for p in participants:
-        user_goals = [g for g in goals if g["user_id"] == p["user_id"]]
-        if user_goals:
+    for uid, user_goals in by_user.items():
+        if user_goals[0]["name"] is not None:
             glines = ", ".join([f"{g['name']} — {g['target']} ({g['log_style']})" if g["type"] == "count"
                                 else f"{g['name']} — boolean" for g in user_goals])
         else:
             glines = "No goals set."
-        body += f"<@{p['user_id']}>: {glines}\n"
+        body += f"<@{uid}>: {glines}\n"
 
     footer = ("\nWe’re all in this together 💪  If ANYONE fails, EVERYONE fails 🐶🔥\n"
               "Use `/loser` for incremental, `/final` for weekly-final, `/complete` for boolean. "
               "Deadline: Sunday 11:59 PM CT.")
     await channel.send(header + body + footer)
-    conn.close()
 
 async def backup_now(bot: discord.Client):
     """Create a timestamped DB backup before evaluation."""
     p = Path(LOSER_DATA_PATH)
     p.parent.mkdir(parents=True, exist_ok=True)
     backup_name = p.parent / f"backup_{datetime.now(tz).strftime('%Y%m%d_%H%M%S')}.db"
-    copyfile(p, backup_name)
+    await repo.snapshot(backup_name)
     # ... make backup_name ...
     channel = _resolve_message_channel(bot, CHALLENGE_CHANNEL_ID) # type: ignore
     if channel:
         await channel.send(f"💾 Auto-backup saved: `{backup_name.name}`")
 
 async def evaluate_week(bot: discord.Client):
-    conn = get_db()
-    cur = conn.cursor()
-    participants = cur.execute("SELECT * FROM participants WHERE active=1").fetchall()
     wstart = week_start_date()
     failed_users = []
 
-    for p in participants:
-        uid = p["user_id"]
-        goals = cur.execute("SELECT * FROM goals_default WHERE user_id=?", (uid,)).fetchall()
-        for g in goals:
-            if g["type"] == "count":
-                if g["log_style"] == "incremental":
-                    row = cur.execute("""
-                        SELECT value_total FROM progress WHERE user_id=? AND week_start=? AND name=?
-                    """, (uid, str(wstart), g["name"])).fetchone()
-                    val = row["value_total"] if row else 0
-                    if val < g["target"]:
-                        failed_users.append(uid)
-                else:  # weekly_final
-                    row = cur.execute("""
-                        SELECT value FROM finals WHERE user_id=? AND week_start=? AND name=?
-                    """, (uid, str(wstart), g["name"])).fetchone()
-                    val = row["value"] if row else 0
-                    if val < g["target"]:
-                        failed_users.append(uid)
-            else:  # boolean
-                row = cur.execute("""
-                    SELECT done FROM booleans WHERE user_id=? AND week_start=? AND name=?
-                """, (uid, str(wstart), g["name"])).fetchone()
-                if not row or not row["done"]:
-                    failed_users.append(uid)
+    rows = await repo.weekly_status(str(wstart))
+    participants = list(dict.fromkeys(r["user_id"] for r in rows))
+    for r in rows:
+        if r["name"] is not None and not r["complete"]:
+            failed_users.append(r["user_id"])
+
+    # Streak bookkeeping
+    streak, best = await repo.team_stats()
 
     channel = _resolve_message_channel(bot, CHALLENGE_CHANNEL_ID) # type: ignore
     if channel is None:
@@ -138,23 +177,15 @@ async def evaluate_week(bot: discord.Client):
 
     loser_role = guild.get_role(LOSER_ROLE_ID)
 
-    # Streak bookkeeping
-    ts = cur.execute("SELECT streak, best_streak FROM team_stats WHERE id=1").fetchone()
-    streak, best = (ts["streak"], ts["best_streak"]) if ts else (0, 0)
-
     if failed_users:
         # Reset streak
         prev = streak
         streak = 0
-        cur.execute("UPDATE team_stats SET streak=?, best_streak=? WHERE id=1", (streak, max(best, prev)))
-        # Assign loser role to everyone
-        for p in participants:
-            member = guild.get_member(p["user_id"])
-            if member and loser_role:
-                try:
-                    await member.add_roles(loser_role)
-                except discord.Forbidden:
-                    print(f"⚠️ Missing permissions to add role for {member}")
+        best = max(best, prev)
+        # Assign loser role to everyone (who doesn't have it yet)
+        if loser_role:
+            members = [m for m in map(guild.get_member, participants) if m and loser_role not in m.roles]
+            await apply_role(members, loser_role, add=True, label="LOSER role")
 
         # Compose message
         names = "\n".join([f"• <@{uid}> — missed" for uid in sorted(set(failed_users))])
@@ -170,19 +201,15 @@ async def evaluate_week(bot: discord.Client):
         # Increment streak
         streak += 1
         best = max(best, streak)
-        cur.execute("UPDATE team_stats SET streak=?, best_streak=? WHERE id=1", (streak, best))
         # Remove loser role if anyone still had it
-        for p in participants:
-            member = guild.get_member(p["user_id"])
-            if member and loser_role and loser_role in member.roles:
-                try:
-                    await member.remove_roles(loser_role)
-                except discord.Forbidden:
-                    print(f"⚠️ Missing permissions to remove role for {member}")
+        if loser_role:
+            ids = set(participants)
+            members = [m for m in loser_role.members if m.id in ids]
+            await apply_role(members, loser_role, add=False, label="LOSER role")
 
         # Compose message
         hype = random.choice(WIN_LINES)
-        roster = "\n".join([f"<@{p['user_id']}> — ✅" for p in participants]) or "No participants"
+        roster = "\n".join([f"<@{uid}> — ✅" for uid in participants]) or "No participants"
         msg = (f"✅ **TEAM WIN** — Week of {datetime.now(tz).strftime('%m/%d')}\n\n"
                f"🏆 Team Streak: {streak} week{'s' if streak != 1 else ''} (Best: {best})\n\n"
                f"Everyone met their goals this week — no wasabi, just glory. 💪\n\n"
@@ -191,10 +218,7 @@ async def evaluate_week(bot: discord.Client):
                f"Next check-in: Sunday 11:59 PM CT")
         team_result = "WIN"
 
-    cur.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
-                (str(wstart), team_result, ", ".join([str(u) for u in sorted(set(failed_users))])))
-    conn.commit()
-    conn.close()
+    await repo.record_week(str(wstart), streak, best, team_result, sorted(set(failed_users)))
 
     await channel.send(msg)
 
@@ -205,11 +229,7 @@ Messageable = Union[discord.TextChannel, discord.Thread, discord.DMChannel, disc
 async def reset_week(bot: discord.Client):
     """Clear weekly progress tables and remove LOSER roles (fresh week)."""
     # wipe week tables
-    conn = get_db()
-    cur = conn.cursor()
-    cur.executescript("DELETE FROM progress; DELETE FROM finals; DELETE FROM booleans;")
-    conn.commit()
-    conn.close()
+    await repo.clear_week()
 
     # resolve a messageable channel
     channel = _resolve_message_channel(bot, CHALLENGE_CHANNEL_ID) # type: ignore
@@ -225,14 +245,9 @@ async def reset_week(bot: discord.Client):
 
     loser_role = guild.get_role(LOSER_ROLE_ID)
     if loser_role:
-        for member in list(guild.members):
-            if loser_role in member.roles:
-                try:
-                    await member.remove_roles(loser_role, reason="Loser Challenge weekly reset")
-                except discord.Forbidden:
-                    print(f"⚠️ Missing perms to remove role from {member}")
-                except Exception as e:
-                    print(f"⚠️ remove_roles error for {member}: {e}")
+        # role.members comes from the member cache: only the holders, not the whole guild
+        await apply_role(loser_role.members, loser_role, add=False,
+                         reason="Loser Challenge weekly reset", label="LOSER role reset")
 
     try:
         await channel.send("🔄 New week reset complete. Set/keep your defaults and crush it! 💪")
@@ -0,0 +1,28 @@
+# tests/conftest.py
+import os
+import sys
+
+# the bots are flat top-level modules, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def loser_conn(tmp_path):
+    """A pooled connection to a freshly migrated scratch Loser database."""
+    from database import ConnectionPool, migrate
+
+    scratch = ConnectionPool(str(tmp_path / "loser.db"))
+    with scratch.connection() as conn:
+        migrate(conn)
+        yield conn
+    scratch.close()
+
+
+@pytest.fixture
+def wordle_bot(tmp_path, monkeypatch):
+    """The Wordle bot module, imported away from the repo's scores.json seed."""
+    monkeypatch.chdir(tmp_path)
+    import wordle_bot
+    return wordle_bot
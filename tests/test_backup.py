@@ -0,0 +1,65 @@
+# tests/test_backup.py
+import asyncio
+import gzip
+import hashlib
+import json
+import sqlite3
+
+import pytest
+
+from wordle_backup import read_backup, scores_digest, write_backup
+from wordle_db import init_wordle_db, import_scores_json
+from wordle_store import ScoreStore
+
+
+def _export(store):
+    async def run():
+        await asyncio.wrap_future(store.close_week("2024-03-11", {"gold": ["1"], "silver": [],
+                                                                   "bronze": [], "waffle": []}))
+        store.record_game("2", "1010", 3)
+        return await store.export()
+    return asyncio.run(run())
+
+
+def test_backup_round_trips_live_scores_and_archive(tmp_path):
+    store = ScoreStore(tmp_path / "w.db").load()
+    store.record_games([("1", "1000", 2), ("2", "1000", 5)])
+    scores = _export(store)
+    store.close()
+    assert [w["week_start"] for w in scores["_weeks"]] == ["2024-03-11"]
+    assert scores["_weeks"][0]["results"]["1"] == {"games": {"1000": 2}, "place": "gold"}
+
+    digest = write_backup(scores, tmp_path / "b.json.gz")
+    assert list(tmp_path.glob("*.tmp")) == []
+    restored = read_backup(tmp_path / "b.json.gz")
+    assert scores_digest(restored) == digest
+
+    conn = sqlite3.connect(tmp_path / "restored.db")
+    init_wordle_db(conn)
+    assert import_scores_json(conn, restored) == 2
+    assert conn.execute("SELECT user_id, total, games, place FROM week_results ORDER BY user_id").fetchall() == [
+        (1, 2, 1, "gold"), (2, 5, 1, None)]
+    assert conn.execute("SELECT user_id, tries FROM games").fetchall() == [(2, 3)]
+    conn.close()
+
+
+def test_digest_ignores_meta():
+    scores = {"1": {"total": 3, "games": {"1000": 3}}, "_meta": {"last_backup": {"sha256": "x"}}}
+    other = dict(scores, _meta={"last_backup": {"sha256": "y"}})
+    assert scores_digest(scores) == scores_digest(other)
+    assert scores_digest(scores) != scores_digest(dict(scores, **{"1": {"total": 4, "games": {"1000": 4}}}))
+
+
+@pytest.mark.parametrize("scores", [
+    {"2": {"games": {"1000": 3}}, "10": {"games": {}}, "_meta": {"a": 1}, "_weeks": []},
+    {"_meta": {"a": 1}, "_weeks": []},
+    {"1": {"games": {}}, "_meta": {"a": 1}},
+    {"_meta": {"a": 1}},
+    {"1": {"games": {}}},
+])
+def test_file_is_plain_sorted_json_and_digest_matches_it_without_meta(tmp_path, scores):
+    digest = write_backup(scores, tmp_path / "b.json.gz")
+    raw = gzip.decompress((tmp_path / "b.json.gz").read_bytes())
+    assert raw == json.dumps(scores, separators=(",", ":"), sort_keys=True).encode()
+    without = {k: v for k, v in scores.items() if k != "_meta"}
+    assert digest == hashlib.sha256(json.dumps(without, separators=(",", ":"), sort_keys=True).encode()).hexdigest()
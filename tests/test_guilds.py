@@ -0,0 +1,57 @@
+# tests/test_guilds.py
+import asyncio
+import json
+
+import pytest
+
+from wordle_guilds import GuildStores
+
+
+def test_without_legacy_data_every_guild_gets_a_partition(tmp_path):
+    stores = GuildStores(tmp_path / "wordle.db")
+    stores.claim_home([1, 2])
+    asyncio.run(stores.preload([1, 2]))
+    try:
+        assert stores.home == 0
+        assert {g: s.db_path for g, s in stores.items()} == {1: str(tmp_path / "wordle_1.db"),
+                                                             2: str(tmp_path / "wordle_2.db")}
+        assert not (tmp_path / "wordle.db").exists()
+    finally:
+        stores.close()
+
+
+def test_configured_home_is_remembered(tmp_path):
+    stores = GuildStores(tmp_path / "wordle.db", home_guild_id=7)
+    asyncio.run(stores.preload([7]))
+    assert stores.get(7).db_path == str(tmp_path / "wordle.db")
+    stores.close()
+
+    again = GuildStores(tmp_path / "wordle.db")
+    try:
+        assert again.home == 7
+        assert again.get(7).meta["guild_id"] == 7
+    finally:
+        again.close()
+
+
+def test_single_guild_adopts_legacy_data(tmp_path):
+    legacy = tmp_path / "scores.json"
+    legacy.write_text(json.dumps({"1": {"total": 3, "games": {"1500": 3}, "joined": True, "wins": 0}}))
+    stores = GuildStores(tmp_path / "wordle.db", legacy_json=legacy)
+    stores.claim_home([5])
+    asyncio.run(stores.preload([5]))
+    try:
+        assert stores.home == 5
+        store = stores.get(5)
+        assert store.db_path == str(tmp_path / "wordle.db")
+        assert store.scores["1"]["total"] == 3 and store.meta["guild_id"] == 5
+    finally:
+        stores.close()
+
+
+def test_several_guilds_with_legacy_data_refuse_to_start(tmp_path):
+    (tmp_path / "wordle.db").touch()
+    stores = GuildStores(tmp_path / "wordle.db")
+    with pytest.raises(RuntimeError, match="WORDLE_HOME_GUILD_ID"):
+        stores.claim_home([5, 6])
+    assert stores.home == 0 and stores.items() == []
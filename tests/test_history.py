@@ -0,0 +1,64 @@
+# tests/test_history.py
+import pytest
+
+from wordle_history import MAX_SPAN, GameHistory, RangeTotals
+
+
+def test_set_get_and_cached_totals():
+    hist = GameHistory()
+    hist[1000] = 4
+    hist[1002] = 7
+    hist[1002] = 3
+    assert hist.base == 1000
+    assert hist[1000] == 4 and hist.get(1001) is None and "1002" in hist
+    assert (hist.total, len(hist)) == (7, 2)
+    assert hist.items() == [("1000", 4), ("1002", 3)]
+
+
+def test_earlier_game_shifts_base():
+    hist = GameHistory()
+    hist[1005] = 2
+    hist[1001] = 5
+    assert hist.base == 1001
+    assert hist.items() == [("1001", 5), ("1005", 2)]
+
+
+def test_round_trips_through_bytes():
+    hist = GameHistory()
+    hist[1200] = 3
+    hist[1210] = 6
+    again = GameHistory.from_bytes(hist.to_bytes())
+    assert again.items() == hist.items()
+    assert (again.total, len(again)) == (9, 2)
+
+
+@pytest.mark.parametrize("num", [-1, 2 ** 32, 1000 + MAX_SPAN])
+def test_out_of_range_number_leaves_history_untouched(num):
+    hist = GameHistory()
+    hist[1000] = 4
+    before = hist.to_bytes()
+    assert not hist.fits(num)
+    with pytest.raises(ValueError):
+        hist[num] = 3
+    assert hist.to_bytes() == before and len(hist) == 1
+
+
+def test_range_totals_windows():
+    rt = RangeTotals()
+    rt.set(1000, 4)
+    rt.set(1003, 2)
+    rt.set(1001, 7)
+    assert rt.window(1000, 1003) == (13, 3)
+    assert rt.window(1001, 1002) == (7, 1)
+    assert rt.window(990, 999) == (0, 0)
+    rt.set(1001, 3)
+    assert rt.window(1000, 1003) == (9, 3)
+
+
+def test_range_totals_extend_and_prepend_match_rebuild():
+    rt = RangeTotals()
+    for num, tries in ((1010, 3), (1030, 5), (1002, 6), (1020, 1)):
+        rt.set(num, tries)
+    fresh = RangeTotals(GameHistory.from_bytes(rt.hist.to_bytes()))
+    assert list(rt._tries) == list(fresh._tries)
+    assert list(rt._games) == list(fresh._games)
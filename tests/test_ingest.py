@@ -0,0 +1,33 @@
+# tests/test_ingest.py
+import asyncio
+
+from wordle_guilds import GuildStores
+from wordle_ingest import Ingestor
+
+
+def test_bad_submission_is_dropped_alone(tmp_path):
+    stores = GuildStores(tmp_path / "wordle.db")
+    recorded = []
+
+    async def on_recorded(batch):
+        recorded.extend((s.uid, s.wordle_num) for s in batch)
+
+    async def run():
+        ingest = Ingestor(stores, on_recorded)
+        ingest.start()
+        ingest.submit(1, "1", "1500", 3, None, "a")
+        ingest.submit(1, "2", str(2 ** 32), 4, None, "b")
+        ingest.submit(1, "3", "1500", 9, None, "c")
+        ingest.submit(1, "4", "1500", 5, None, "d")
+        await ingest.stop()
+        await asyncio.sleep(0)   # let the confirmation callback run
+        return ingest
+
+    try:
+        ingest = asyncio.run(run())
+        store = stores.get(1)
+        assert sorted(recorded) == [("1", "1500"), ("4", "1500")]
+        assert ingest.committed == 2
+        assert sorted(uid for uid, _ in store.users()) == ["1", "4"]
+    finally:
+        stores.close()
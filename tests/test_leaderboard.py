@@ -0,0 +1,45 @@
+# tests/test_leaderboard.py
+from wordle_leaderboard import LeaderboardIndex
+
+
+def _board(**totals):
+    board = LeaderboardIndex()
+    board.reset(totals.items())
+    return board
+
+
+def test_ranked_lowest_total_first():
+    board = _board(a=12, b=9, c=15)
+    assert board.ranked() == [("b", 9), ("a", 12), ("c", 15)]
+
+
+def test_competition_ranking_with_ties():
+    board = _board(a=10, b=12, c=12, d=14)
+    assert board.blocks() == [(1, 10, ["a"]), (2, 12, ["b", "c"]), (4, 14, ["d"])]
+    assert board.rank("c") == 2
+    assert board.rank("d") == 4
+    assert board.rank("nobody") is None
+
+
+def test_update_moves_player_and_keeps_order():
+    board = _board(a=10, b=12)
+    board.update("a", 20)
+    board.update("c", 5)
+    assert board.ranked() == [("c", 5), ("b", 12), ("a", 20)]
+    board.remove("b")
+    assert "b" not in board
+    assert len(board) == 2
+
+
+def test_podium_skips_missing_ranks():
+    # two tied for gold: no silver, rank 3 is bronze, last is waffle
+    podium = _board(a=10, b=10, c=11, d=20).podium()
+    assert podium == {"gold": ["a", "b"], "silver": [], "bronze": ["c"], "waffle": ["d"]}
+
+
+def test_podium_filter():
+    board = _board(a=10, b=11, c=12)
+    podium = board.podium(only={"b", "c"}.__contains__)
+    assert podium["gold"] == ["b"]
+    assert podium["waffle"] == ["c"]
+    assert _board().podium() == {"gold": [], "silver": [], "bronze": [], "waffle": []}
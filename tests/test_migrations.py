@@ -0,0 +1,52 @@
+# tests/test_migrations.py
+import logging
+import sqlite3
+
+import pytest
+
+from database import MIGRATIONS, migrate
+
+
+def _indexes(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")}
+
+
+def test_fresh_database_reaches_latest_version(tmp_path, caplog):
+    conn = sqlite3.connect(tmp_path / "l.db")
+    with caplog.at_level(logging.INFO, logger="database"):
+        assert migrate(conn) == len(MIGRATIONS)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert {"idx_logs_user_week", "idx_logs_user_week_name"} <= _indexes(conn)
+    assert [r.getMessage() for r in caplog.records] == [
+        f"Loser DB migrated to schema v{n}" for n in range(1, len(MIGRATIONS) + 1)]
+    conn.close()
+
+
+def test_rerun_is_a_no_op(loser_conn, caplog):
+    with caplog.at_level(logging.INFO, logger="database"):
+        assert migrate(loser_conn) == len(MIGRATIONS)
+    assert caplog.records == []
+
+
+def test_unversioned_database_is_adopted_with_its_data(tmp_path):
+    # a database from before versioning: the original schema, user_version 0
+    conn = sqlite3.connect(tmp_path / "old.db")
+    conn.executescript(MIGRATIONS[0])
+    conn.execute("INSERT INTO participants (user_id, username) VALUES (1, 'a')")
+    conn.commit()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+
+    assert migrate(conn) == len(MIGRATIONS)
+    assert conn.execute("SELECT user_id, username, active FROM participants").fetchall() == [(1, "a", 1)]
+    conn.close()
+
+
+def test_failed_step_leaves_version_unchanged(tmp_path, monkeypatch):
+    conn = sqlite3.connect(tmp_path / "l.db")
+    migrate(conn)
+    monkeypatch.setattr("database.MIGRATIONS", MIGRATIONS + ["CREATE TABLE broken (;"])
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+    conn.rollback()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    conn.close()
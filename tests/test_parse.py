@@ -0,0 +1,44 @@
+# tests/test_parse.py
+import pytest
+
+from wordle_parse import FAIL, MAX_SKEW_DAYS, Share, parse_share, parse_wordle
+
+GRID = "\n\n⬛🟨⬛⬛⬛\n🟩🟩🟩🟩🟩"
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("Wordle 1500 2/6", ("1500", 2)),
+    ("Wordle 1,500 2/6" + GRID, ("1500", 2)),
+    ("Wordle 1.500 2/6" + GRID, ("1500", 2)),
+    ("Wordle 1\u00a0500 2/6", ("1500", 2)),
+    ("Wordle 1\u202f500 2/6", ("1500", 2)),
+    ("gm!\nWordle 987 X/6", ("987", FAIL)),
+    ("Wordle 987 4/6 \n🟨⬛⬛⬛⬛\n🟨🟨⬛⬛⬛\n🟩🟩🟩⬛🟩\n🟩🟩🟩🟩🟩\ncan't believe it", ("987", 4)),
+])
+def test_parses_shares(content, expected):
+    assert parse_wordle(content) == expected
+
+
+@pytest.mark.parametrize("content", [
+    "the meeting moved to 3/6 at noon",
+    "Wordle was rough today",
+    "Wordle 1500 7/6",
+    "Wordle 1500 2/5",
+    "Wordle 1500 3/6" + GRID,                                 # grid has 2 rows, score says 3
+    "Wordle 1500 X/6\n🟩🟩🟩🟩🟩",                             # X but solved
+    "Wordle 1500 1/6\n🟨🟨🟨🟨🟨",                             # 1/6 but not solved
+])
+def test_rejects_non_shares_and_mismatched_grids(content):
+    assert parse_wordle(content) is None
+
+
+def test_hard_mode_and_colour_blind_palette():
+    assert parse_share("Wordle 1,500 2/6*\n🟧🟦⬜⬜⬜\n🟧🟧🟧🟧🟧") == Share("1500", 2, True)
+    assert parse_share("Wordle 1500 2/6") == Share("1500", 2, False)
+
+
+def test_rejects_numbers_far_from_today():
+    assert parse_wordle("Wordle 1,500 2/6" + GRID, 1500) == ("1500", 2)
+    assert parse_wordle("Wordle 1,500 2/6" + GRID, 1500 + MAX_SKEW_DAYS) == ("1500", 2)
+    assert parse_wordle("Wordle 1,500 2/6" + GRID, 1500 + MAX_SKEW_DAYS + 1) is None
+    assert parse_wordle("Wordle 20000000000 2/6" + GRID, 1500) is None
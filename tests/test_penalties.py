@@ -0,0 +1,61 @@
+# tests/test_penalties.py
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from wordle_history import PENALTY
+from wordle_store import ScoreStore
+
+TODAY = date(2025, 3, 12)
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ScoreStore(tmp_path / "w.db").load()
+    s.set_joined("1", True)
+    s.set_joined("2", True).result(timeout=5)
+    yield s
+    s.close()
+
+
+def _days_back(bot, n):
+    return [str(bot.date_to_wordle(TODAY - timedelta(days=i))) for i in range(n, 0, -1)]
+
+
+def test_first_run_penalizes_only_yesterday(store, wordle_bot):
+    num = str(wordle_bot.date_to_wordle(YESTERDAY))
+    store.record_game("1", num, 3)
+    missed = asyncio.run(wordle_bot._catch_up_penalties(store, TODAY))
+    assert missed == {num: ["2"]}
+    assert store.scores["2"]["games"][num] == PENALTY and store.scores["2"]["total"] == 7
+    assert store.meta["last_penalized_day"] == YESTERDAY.isoformat()
+
+
+def test_second_run_the_same_day_is_a_no_op(store, wordle_bot):
+    asyncio.run(wordle_bot._catch_up_penalties(store, TODAY))
+    units = store.units
+    assert asyncio.run(wordle_bot._catch_up_penalties(store, TODAY)) == {}
+    assert store.units == units and store.scores["2"]["total"] == 7
+
+
+def test_catch_up_is_capped_and_written_in_one_transaction(store, wordle_bot):
+    store.set_meta("last_penalized_day", (TODAY - timedelta(days=20)).isoformat())
+    units = store.units
+    missed = asyncio.run(wordle_bot._catch_up_penalties(store, TODAY))
+    assert list(missed) == _days_back(wordle_bot, wordle_bot.MAX_CATCHUP_DAYS)
+    assert all(uids == ["1", "2"] for uids in missed.values())
+    assert store.units == units + 1
+    assert store.scores["1"]["total"] == 7 * wordle_bot.MAX_CATCHUP_DAYS
+
+
+def test_skip_days_in_range_are_consumed_and_later_ones_kept(store, wordle_bot):
+    skipped, later = TODAY - timedelta(days=2), TODAY + timedelta(days=4)
+    store.set_meta("last_penalized_day", (TODAY - timedelta(days=4)).isoformat())
+    store.set_meta("skip_penalty_days", [skipped.isoformat(), later.isoformat()])
+    missed = asyncio.run(wordle_bot._catch_up_penalties(store, TODAY))
+    days = _days_back(wordle_bot, 3)
+    assert list(missed) == [days[0], days[2]]
+    assert store.meta["skip_penalty_days"] == [later.isoformat()]
+    assert store.meta["last_penalized_day"] == YESTERDAY.isoformat()
@@ -0,0 +1,41 @@
+# tests/test_query_plans.py
+import pytest
+
+from repository import HISTORY_BY_NAME_SQL, HISTORY_SQL, LAST_NOTES_SQL, MY_WEEK_SQL, WEEKLY_STATUS_SQL
+
+WEEK = "2025-01-06"
+
+
+@pytest.fixture
+def filled(loser_conn):
+    loser_conn.executemany(
+        "INSERT INTO logs (user_id, week_start, name, kind, delta, note, ts_utc) "
+        "VALUES (?, ?, ?, 'incremental', 1, 'n', '2025-01-06T00:00:00+00:00')",
+        [(u, f"2025-01-{d:02}", g) for u in range(50) for d in range(1, 29) for g in ("Gym", "Read", "Walk")])
+    loser_conn.execute("ANALYZE")
+    return loser_conn
+
+
+def _plan(conn, sql, params):
+    return [r["detail"] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+@pytest.mark.parametrize("sql, params, index", [
+    (HISTORY_SQL, (1, WEEK, 10), "COVERING INDEX idx_logs_user_week "),
+    (HISTORY_BY_NAME_SQL, (1, WEEK, "Gym", 10), "COVERING INDEX idx_logs_user_week_name "),
+    (LAST_NOTES_SQL, (1, WEEK), "COVERING INDEX idx_logs_user_week_name "),
+    (MY_WEEK_SQL, (WEEK,) * 3 + (1,), "INDEX sqlite_autoindex_progress_1 "),
+    (WEEKLY_STATUS_SQL, (WEEK,) * 3, "INDEX sqlite_autoindex_progress_1 "),
+], ids=["history", "history by goal", "last notes", "my week", "weekly status"])
+def test_hot_queries_use_their_index_without_sorting(filled, sql, params, index):
+    plan = _plan(filled, sql, params)
+    assert any(index in d for d in plan), plan
+    assert not any("TEMP B-TREE" in d for d in plan), plan
+    assert not any(d.startswith("SCAN logs") for d in plan), plan
+
+
+def test_history_returns_newest_first(filled):
+    filled.execute("INSERT INTO logs (user_id, week_start, name, kind, delta, note, ts_utc) "
+                   "VALUES (1, ?, 'Gym', 'undo', -1, 'oops', 'later')", (WEEK,))
+    rows = filled.execute(HISTORY_SQL, (1, WEEK, 2)).fetchall()
+    assert [(r["kind"], r["note"]) for r in rows] == [("undo", "oops"), ("incremental", "n")]
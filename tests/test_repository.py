@@ -0,0 +1,34 @@
+# tests/test_repository.py
+import asyncio
+import threading
+
+from database import ConnectionPool, migrate
+from repository import LoserRepository
+
+
+def test_reads_do_not_wait_behind_writes(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "loser.db"))
+    with pool.connection() as conn:
+        migrate(conn)
+    repo = LoserRepository(pool)
+    release = threading.Event()
+
+    def slow_join(conn):
+        conn.execute("INSERT INTO participants (user_id, username, active) VALUES (1, 'a', 1)")
+        release.wait(5)
+
+    async def scenario():
+        await repo.join(2, "b")
+        write = repo.write(slow_join)
+        # the writer is stuck mid-transaction; the read still answers with the last commit
+        rows = await asyncio.wait_for(repo.active_participants(), 2)
+        assert [r["user_id"] for r in rows] == [2]
+        release.set()
+        await write
+        assert [r["user_id"] for r in await repo.active_participants()] == [1, 2]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.close()
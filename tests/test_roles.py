@@ -0,0 +1,56 @@
+# tests/test_roles.py
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import scheduler
+
+
+def _error(cls, status, headers=None):
+    response = SimpleNamespace(status=status, reason="", headers=headers or {})
+    return cls(response, "nope")
+
+
+class FakeMember:
+    def __init__(self, name, *errors):
+        self.name = name
+        self.errors = list(errors)
+        self.calls = 0
+        self.roles = set()
+
+    async def add_roles(self, role, reason=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.roles.add(role)
+
+    def __str__(self):
+        return self.name
+
+
+def test_retries_429s_and_counts_successes(monkeypatch, capsys):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(scheduler.asyncio, "sleep", fake_sleep)
+    once = FakeMember("once", _error(discord.HTTPException, 429, {"Retry-After": "0.25"}))
+    fine = FakeMember("fine")
+    forbidden = FakeMember("forbidden", _error(discord.Forbidden, 403))
+    always = FakeMember("always", *[_error(discord.HTTPException, 429)] * (scheduler.ROLE_RETRIES + 1))
+
+    ok = asyncio.run(scheduler.apply_role([once, fine, forbidden, always], "LOSER", add=True, label="losers"))
+
+    assert ok == 2
+    assert "LOSER" in once.roles and "LOSER" in fine.roles and not forbidden.roles and not always.roles
+    assert (once.calls, fine.calls, forbidden.calls) == (2, 1, 1)
+    assert always.calls == scheduler.ROLE_RETRIES + 1
+    # Retry-After when given, else 1, 2, 4 … seconds; no sleep after the last attempt
+    assert sorted(slept) == sorted([0.25] + [2 ** a for a in range(scheduler.ROLE_RETRIES)])
+    assert capsys.readouterr().out.splitlines()[-1] == "👥 losers: 4/4"
+
+
+def test_no_members_is_a_no_op():
+    assert asyncio.run(scheduler.apply_role([], "LOSER", add=False)) == 0
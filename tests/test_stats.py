@@ -0,0 +1,43 @@
+# tests/test_stats.py
+from wordle_history import PENALTY, GameHistory, RangeTotals
+from wordle_stats import compute_stats, merge_histograms
+
+
+def _hist(**games):
+    hist = GameHistory()
+    for num, tries in games.items():
+        hist[int(num[1:])] = tries
+    return hist
+
+
+def test_histogram_streaks_and_average():
+    st = compute_stats(_hist(n100=3, n101=4, n102=7, n104=3))
+    assert st.played == 4 and st.total == 17
+    assert st.histogram == (0, 0, 2, 1, 0, 0, 1)
+    assert (st.best_streak, st.tail_streak, st.last_num) == (3, 1, 104)
+    assert st.fail_rate == 0.25
+    assert st.current_streak(105) == 1 and st.current_streak(106) == 0
+
+
+def test_penalties_score_but_are_not_games():
+    hist = _hist(n100=3, n101=PENALTY, n102=4, n103=PENALTY)
+    assert hist.total == 3 + 7 + 4 + 7
+    assert RangeTotals(hist).window(100, 103) == (21, 4)
+
+    st = compute_stats(hist)
+    assert st.played == 2 and st.total == 7
+    assert st.histogram[-1] == 0 and st.fail_rate == 0.0
+    assert (st.best_streak, st.last_num) == (1, 102)
+
+
+def test_overwriting_a_penalty_keeps_totals_in_step():
+    hist = _hist(n100=PENALTY)
+    hist[100] = 2
+    assert (hist.total, len(hist)) == (2, 1)
+    assert compute_stats(hist).played == 1
+
+
+def test_merge_histograms():
+    a = compute_stats(_hist(n1=1, n2=7))
+    b = compute_stats(_hist(n1=1))
+    assert merge_histograms([a, b]) == (2, 0, 0, 0, 0, 0, 1)
@@ -0,0 +1,47 @@
+# tests/test_weekly_status.py
+from repository import WEEKLY_STATUS_SQL
+
+WEEK = "2025-01-06"
+
+
+def _status(conn):
+    return {(r["user_id"], r["name"]): (r["value"], bool(r["complete"]))
+            for r in conn.execute(WEEKLY_STATUS_SQL, (WEEK,) * 3)}
+
+
+def test_completion_rules_per_goal_type(loser_conn):
+    conn = loser_conn
+    conn.executemany("INSERT INTO participants (user_id, username, active) VALUES (?, ?, ?)",
+                     [(1, "a", 1), (2, "b", 1), (3, "c", 0)])
+    conn.executemany("INSERT INTO goals_default VALUES (?, ?, ?, ?, ?, ?)", [
+        (1, "Gym", "count", 3, "incremental", "sessions"),
+        (1, "Read", "count", 5, "weekly_final", "books"),
+        (1, "Run", "count", 2, "incremental", "runs"),
+        (1, "Meditate", "boolean", None, None, None),
+        (1, "Walk", "boolean", None, None, None),
+        (3, "Gym", "count", 1, "incremental", "sessions"),
+    ])
+    conn.executemany("INSERT INTO progress VALUES (?, ?, ?, ?)",
+                     [(1, WEEK, "Gym", 3), (1, "2024-12-30", "Run", 9), (3, WEEK, "Gym", 5)])
+    conn.execute("INSERT INTO finals VALUES (1, ?, 'Read', 4)", (WEEK,))
+    conn.executemany("INSERT INTO booleans VALUES (?, ?, ?, ?)",
+                     [(1, WEEK, "Meditate", 1), (1, WEEK, "Walk", 0)])
+
+    assert _status(conn) == {
+        (1, "Gym"): (3, True),           # incremental: this week's running total vs target
+        (1, "Meditate"): (1, True),
+        (1, "Read"): (4, False),         # weekly_final: the set value vs target
+        (1, "Run"): (0, False),          # progress from another week doesn't count
+        (1, "Walk"): (0, False),
+        (2, None): (0, False),           # active but no goals: one row, never complete
+    }
+
+
+def test_weekly_final_ignores_incremental_progress(loser_conn):
+    conn = loser_conn
+    conn.execute("INSERT INTO participants (user_id, username) VALUES (1, 'a')")
+    conn.execute("INSERT INTO goals_default VALUES (1, 'Read', 'count', 2, 'weekly_final', 'books')")
+    conn.execute("INSERT INTO progress VALUES (1, ?, 'Read', 9)", (WEEK,))
+    assert _status(conn) == {(1, "Read"): (0, False)}
+    conn.execute("INSERT INTO finals VALUES (1, ?, 'Read', 2)", (WEEK,))
+    assert _status(conn) == {(1, "Read"): (2, True)}
@@ -0,0 +1,134 @@
+# tests/test_wordle_store.py
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from wordle_store import ScoreStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ScoreStore(tmp_path / "w.db").load()
+    yield s
+    s.close()
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_close_flushes_queued_writes(tmp_path):
+    s = ScoreStore(tmp_path / "w.db").load()
+    for n in range(100):
+        s.record_game(str(n), "1000", 3)
+    s.close()
+    assert _rows(tmp_path / "w.db", "SELECT COUNT(*) FROM games") == [(100,)]
+
+
+def test_failed_unit_rolls_back_alone_and_reports(store):
+    ok = store.record_game("1", "1000", 4)
+    with store._tx() as bad:
+        store._exec("INSERT INTO no_such_table VALUES (1)")
+    also_ok = store.record_game("2", "1000", 5)
+
+    with pytest.raises(sqlite3.OperationalError):
+        bad.result(timeout=5)
+    assert ok.result(timeout=5) is None
+    assert also_ok.result(timeout=5) is None
+    store.close()
+    assert sorted(_rows(store.db_path, "SELECT user_id, tries FROM games")) == [(1, 4), (2, 5)]
+
+
+def test_nested_writes_share_one_future(store):
+    done = store.close_week("2025-01-06", {"gold": [], "silver": [], "bronze": [], "waffle": []})
+    assert done.result(timeout=5) is None
+
+
+def test_bad_batch_is_rejected_before_anything_changes(store):
+    store.record_game("1", "1000", 4).result(timeout=5)
+    with pytest.raises(ValueError):
+        store.record_games([("2", "1001", 3), ("1", str(2 ** 32), 2)])
+    assert "2" not in store.scores
+    assert store.scores["1"]["games"].items() == [("1000", 4)]
+
+
+def test_window_totals_can_be_limited_to_joined_players(store):
+    store.record_games([("1", "1000", 4), ("2", "1000", 2)])
+    store.set_joined("2", False)
+    assert sorted(store.window_totals(1000, 1000)) == [("1", 4, 1), ("2", 2, 1)]
+    assert store.window_totals(1000, 1000, store.joined_users()) == [("1", 4, 1)]
+
+
+def test_backfill_merges_closed_weeks_into_the_archive(store):
+    async def run():
+        store.record_games([("1", "1000", 4), ("2", "1000", 3)])
+        await asyncio.wrap_future(store.close_week("2024-03-11", {"gold": ["2"], "silver": ["1"],
+                                                                   "bronze": [], "waffle": []}))
+        assert await store.last_closed_week() == "2024-03-11"
+        done = await store.record_backfill(
+            [("1", "1010", 2)],
+            {"2024-03-11": [("1", "1001", 5)], "2024-03-04": [("2", "995", 6)]},
+            meta={"backfill_checkpoints": {"9": 123}})
+        await asyncio.wrap_future(done)
+
+    asyncio.run(run())
+    assert store.scores["1"]["games"].items() == [("1010", 2)]
+    assert store.ranges["1"].window(1000, 1001) == (9, 2)
+    assert store.ranges["2"].window(995, 1000) == (9, 2)
+    store.close()
+    assert sorted(_rows(store.db_path, """
+        SELECT w.week_start, r.user_id, r.total, r.games, r.place
+        FROM week_results r JOIN weeks w ON w.week_id = r.week_id""")) == [
+        ("2024-03-04", 2, 6, 1, None),
+        ("2024-03-11", 1, 9, 2, "silver"),
+        ("2024-03-11", 2, 3, 1, "gold"),
+    ]
+    assert _rows(store.db_path, "SELECT value FROM meta WHERE key = 'backfill_checkpoints'") == [('{"9": 123}',)]
+
+
+def test_backfill_without_archive_keeps_only_this_week_live(store, wordle_bot):
+    now = datetime.now(wordle_bot.CENTRAL_TZ).date()
+    today = wordle_bot.date_to_wordle(now)
+    monday = today - now.weekday()
+    games = [("1", str(num), 4) for num in range(today - 89, today + 1)]
+
+    async def run():
+        await asyncio.wrap_future(await wordle_bot._backfill_commit(store, games, 9, 123))
+        return await store.alltime()
+
+    summary = asyncio.run(run())
+    live = store.scores["1"]["games"]
+    assert [int(n) for n, _ in live.items()] == list(range(monday, today + 1))
+    assert live.total == 4 * (today + 1 - monday)
+    assert store.ranges["1"].window(today - 89, today) == (360, 90)
+    assert len(summary) == 1 and summary[0]["games"] == 90 - (today + 1 - monday)
+
+
+def test_legacy_out_of_range_numbers_are_skipped_not_fatal(tmp_path):
+    legacy = tmp_path / "scores.json"
+    legacy.write_text('{"1": {"total": 7, "games": {"1500": 3, "20000000": 4}, "joined": true, "wins": 0}}')
+    for _ in range(2):   # the restart after the import must load too
+        s = ScoreStore(tmp_path / "w.db", legacy_json=legacy).load()
+        assert s.scores["1"]["games"].items() == [("1500", 3)]
+        assert s.scores["1"]["total"] == 3
+        s.close()
+
+
+def test_old_rows_that_do_not_fit_are_dropped_on_load(tmp_path):
+    ScoreStore(tmp_path / "w.db").load().close()
+    conn = sqlite3.connect(tmp_path / "w.db")
+    conn.execute("INSERT INTO users (user_id) VALUES (1)")
+    conn.executemany("INSERT INTO games VALUES (1, ?, ?)", [(1500, 3), (20000000, 4), (1501, 9)])
+    conn.commit()
+    conn.close()
+
+    s = ScoreStore(tmp_path / "w.db").load()
+    assert s.scores["1"]["games"].items() == [("1500", 3), ("1501", 9)]
+    s.close()
+    assert _rows(tmp_path / "w.db", "SELECT wordle_num FROM games ORDER BY wordle_num") == [(1500,), (1501,)]
@@ -0,0 +1,82 @@
+# wordle_backup.py
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+_CHUNK = 64 * 1024
+
+
+def _encode(scores: dict):
+    """
+    Compact, key-sorted JSON for `scores` as (bytes, hashed) chunks of about
+    64 KiB. The `_meta` entry (with its leading comma) comes in chunks of
+    its own with hashed False, so the hashed bytes are exactly the document
+    without it.
+    """
+    enc = json.JSONEncoder(separators=(",", ":"), sort_keys=True)
+    keys = sorted(scores)
+    buf, size, hashed = ["{"], 1, True
+    for i, key in enumerate(keys):
+        if (key != "_meta") != hashed:
+            yield "".join(buf).encode(), hashed
+            buf, size, hashed = [], 0, not hashed
+        # the comma next to _meta belongs to it: before it, or after it if it comes first
+        if i and not (i == 1 and keys[0] == "_meta"):
+            buf.append(",")
+        buf.append(enc.encode(key) + ":")
+        for chunk in enc.iterencode(scores[key]):
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= _CHUNK:
+                yield "".join(buf).encode(), hashed
+                buf, size = [], 0
+        if i == 0 and key == "_meta" and len(keys) > 1:
+            buf.append(",")
+    if not hashed:
+        yield "".join(buf).encode(), hashed
+        buf = []
+    buf.append("}")
+    yield "".join(buf).encode(), True
+
+
+def scores_digest(scores: dict) -> str:
+    """SHA-256 of the score data in `scores`, i.e. everything but `_meta` bookkeeping."""
+    digest = hashlib.sha256()
+    for data, hashed in _encode(scores):
+        if hashed:
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def write_backup(scores: dict, path) -> str:
+    """
+    Stream `scores` as compact JSON into a gzip file and return its
+    scores_digest, hashed in the same encoding pass. Encoder chunks go
+    straight to the compressor, so no full copy of the document is built.
+    Blocking; run it in a thread.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    digest = hashlib.sha256()
+    try:
+        # mtime=0 keeps the gzip header stable, so equal data gives equal files
+        with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            for data, hashed in _encode(scores):
+                gz.write(data)
+                if hashed:
+                    digest.update(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return digest.hexdigest()
+
+
+def read_backup(path) -> dict:
+    """Load a scores file written by write_backup or a plain scores.json."""
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    opener = gzip.open if gzipped else open
+    with opener(path, "rt") as f:
+        return json.load(f)
@@ -1,70 +1,69 @@
+import asyncio
 import discord
 from discord.ext import commands
-from discord.ext import tasks
-import re
 import json
 import os
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta, date
 import pytz
 import logging
-from config import WORDLE_DATA_PATH
+import atexit
+from config import WORDLE_DATA_PATH, WORDLE_DB_PATH, WORDLE_HOME_GUILD_ID, WORDLE_LEADERBOARD_WINDOW
+from wordle_store import atomic_write_text
+from wordle_guilds import ChannelIndex, GuildStores
+from wordle_names import NameResolver
+from wordle_leaderboard import LeaderboardIndex, LeaderboardPublisher, LEADERBOARD_HEADER
+from wordle_ingest import Ingestor
+from wordle_history import PENALTY
+from wordle_stats import histogram_lines, merge_histograms
+from wordle_backup import read_backup, write_backup
+from wordle_parse import parse_wordle
+from scheduler import job_scheduler, ensure_scheduler_started
 
 logging.basicConfig(level=logging.INFO)
 
 # === File Paths ===
 DATA_FILE = Path(WORDLE_DATA_PATH)
-INIT_FILE = Path("scores.json")
+# seed file: a plain scores.json or a !backup download (.json.gz)
+INIT_FILE = next((p for p in (Path("scores.json"), Path("scores.json.gz")) if p.exists()), None)
 
-if not DATA_FILE.exists() and INIT_FILE.exists():
-    with open(INIT_FILE, "r") as f:
-        data = json.load(f)
-        if "players" in data:
-            del data["players"]
-        DATA_FILE.write_text(json.dumps(data, separators=(',', ':')))
+if not DATA_FILE.exists() and INIT_FILE is not None:
+    data = read_backup(INIT_FILE)
+    if "players" in data:
+        del data["players"]
+    atomic_write_text(DATA_FILE, json.dumps(data, separators=(',', ':')))
 
 # === Constants ===
 CENTRAL_TZ = pytz.timezone("America/Chicago")
 WORDLE_START_DATE = datetime(2021, 6, 19)
 
 # === Bot Setup ===
+class WordleBot(commands.Bot):
+    async def close(self):
+        # commit queued submissions and drain every writer thread before the
+        # process goes away (worker_main calls this on SIGTERM)
+        await ingest.stop()
+        await asyncio.to_thread(stores.close)
+        await super().close()
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# === Load/Save Functions ===
-def load_scores():
-    if not DATA_FILE.exists():
-        DATA_FILE.write_text("{}")
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
-
-def save_scores(scores):
-    with open(DATA_FILE, "w") as f:
-        json.dump(scores, f, separators=(',', ':'))
-
-# === Wordle Helper ===
-# Helper: check if key is a real user record (ignore internal metadata)
-def _is_user_record(k, v):
-    return isinstance(v, dict) and not str(k).startswith("_") and ("total" in v and "games" in v)
-
-_DEF_META = {
-    "last_podium": {"gold": [], "silver": [], "bronze": [], "waffle": []},
-    "skip_penalty_days": [],   # list of ISO dates (YYYY-MM-DD) to not penalize
-    "last_penalized_day": ""   # ISO date we last processed (idempotence)
-}
-
-
-def ensure_meta(scores: dict):
-    if not isinstance(scores, dict):
-        return {"_meta": dict(_DEF_META)}
-    meta = scores.get("_meta")
-    if not isinstance(meta, dict):
-        scores["_meta"] = dict(_DEF_META)
-    else:
-        for k, v in _DEF_META.items():
-            scores["_meta"].setdefault(k, v)
-    return scores
+bot = WordleBot(command_prefix="!", intents=intents)
+names = NameResolver(bot)
+
+# === Score Stores ===
+# One SQLite-backed store per guild; the home guild's empty database is seeded once from DATA_FILE.
+stores = GuildStores(WORDLE_DB_PATH, legacy_json=DATA_FILE, home_guild_id=WORDLE_HOME_GUILD_ID)
+atexit.register(stores.close)
+
+@bot.check
+async def _guild_only(ctx):
+    # scores are per server, so there is nothing to show in DMs
+    return ctx.guild is not None
+
+def _store(ctx):
+    return stores.get(ctx.guild.id)
 
 # Use universal Wordle epoch to avoid timezone/anchor drift
 WORDLE_EPOCH = date(2021, 6, 19)  # Wordle #0 release date (universal)
@@ -75,18 +74,15 @@ def wordle_to_date(wordle_num: int) -> date:
 def date_to_wordle(some_date: date) -> int:
     return (some_date - WORDLE_EPOCH).days
 
-async def build_leaderboard_text():
-    scores = load_scores()
-    ensure_meta(scores)
-    if not scores:
+async def build_leaderboard_text(guild=None):
+    if guild is None:
+        return "No scores yet."
+    store = stores.get(guild.id)
+    entries = [(uid, store.get(uid)) for uid, _ in store.board.ranked()]
+    if not entries:
         return "No scores yet."
 
-    podium = scores["_meta"].get("last_podium", {"gold": [], "silver": [], "bronze": [], "waffle": []})
-
-    entries = [(uid, data) for uid, data in scores.items()
-               if isinstance(data, dict) and not str(uid).startswith("_")
-               and "total" in data and "games" in data]
-    entries.sort(key=lambda x: x[1]["total"])
+    podium = store.meta.get("last_podium", {"gold": [], "silver": [], "bronze": [], "waffle": []})
 
     def medal_for(uid: str) -> str:
         if uid in podium.get("gold", []):   return "👑 "
@@ -95,302 +91,272 @@ async def build_leaderboard_text():
         if uid in podium.get("waffle", []): return "🧇 "
         return ""
 
+    display = await names.resolve([uid for uid, _ in entries], guild)
     lines = []
     for uid, data in entries:
-        user = await bot.fetch_user(int(uid))
         gp = len(data["games"])
-        lines.append(f"{medal_for(uid)}**{user.display_name}** — {data['total']} tries over {gp} games")
-
-    return "__**🏆 Wordle Leaderboard**__\n" + "\n".join(lines)
-
-# === Scheduler ===
-@tasks.loop(hours=1)
-async def daily_penalty_check():
-    now = datetime.now(CENTRAL_TZ)
-
-    # We run during the midnight hour CST, and we only want to apply once per day
-    if now.hour != 0:
-        return
-
-    scores = load_scores()
-    ensure_meta(scores)
+        lines.append(f"{medal_for(uid)}**{display[uid]}** — {data['total']} tries over {gp} games")
 
-    target_day = (now.date() - timedelta(days=1))           # penalize yesterday's Wordle
-    stamp = target_day.isoformat()
+    return LEADERBOARD_HEADER + "\n" + "\n".join(lines)
 
-    # Already processed this day? bail
-    if scores["_meta"].get("last_penalized_day") == stamp:
-        return
+# One leaderboard per burst of submissions, edited in place where possible
+publisher = LeaderboardPublisher(build_leaderboard_text, lambda: bot.user,
+                                 window=WORDLE_LEADERBOARD_WINDOW)
 
-    # Admin asked to skip this day? mark as processed and bail
-    if stamp in scores["_meta"].get("skip_penalty_days", []):
-        scores["_meta"]["last_penalized_day"] = stamp
-        scores["_meta"]["skip_penalty_days"] = [
-            d for d in scores["_meta"]["skip_penalty_days"] if d != stamp
-        ]
-        save_scores(scores)
-        return
+# === Scheduler ===
+MAX_CATCHUP_DAYS = 7  # games are weekly, so don't reach further back than that
+
+async def _catch_up_penalties(store, today: date) -> dict[str, list[str]]:
+    """
+    Give 7 tries to joined players for every Wordle since last_penalized_day
+    (up to yesterday) they didn't submit, so days missed while the bot was
+    offline still count. Days in skip_penalty_days are marked processed
+    without penalties. Returns {wordle_num: [uids]}.
+    """
+    meta = store.meta
+    last_day = today - timedelta(days=1)
+    first_day = last_day
+    if meta.get("last_penalized_day"):
+        first_day = max(date.fromisoformat(meta["last_penalized_day"]) + timedelta(days=1),
+                        last_day - timedelta(days=MAX_CATCHUP_DAYS - 1))
+    # Already processed? bail
+    if first_day > last_day:
+        return {}
+
+    days = {(first_day + timedelta(days=i)).isoformat(): date_to_wordle(first_day + timedelta(days=i))
+            for i in range((last_day - first_day).days + 1)}
+    skips = meta.get("skip_penalty_days", [])
+    skip_nums = {num for iso, num in days.items() if iso in skips}
+    remaining_skips = [d for d in skips if d not in days]
+
+    missed = store.missing_range(date_to_wordle(first_day), date_to_wordle(last_day), skip_nums)
+    await asyncio.wrap_future(store.penalize(missed, PENALTY, last_day.isoformat(), remaining_skips))
+    return missed
+
+# Both jobs are cron-fired at exact Central times on the shared APScheduler;
+# last_penalized_day / last_reminder_day make a re-fire after restart a no-op.
+PENALTY_HOUR = 0      # midnight Central, penalizes yesterday
+REMINDER_HOUR = 20    # 8 PM Central
 
-    wordle_num = str(date_to_wordle(target_day))
-
-    # Penalize only joined players who didn't submit
-    joined_users = {
-        uid for uid, data in scores.items()
-        if isinstance(data, dict) and data.get("joined")
-    }
-    penalized = []
-    for uid in joined_users:
-        if wordle_num not in scores[uid]["games"]:
-            scores[uid]["games"][wordle_num] = 7
-            scores[uid]["total"] += 7
-            penalized.append(uid)
-
-    # Mark processed and save
-    scores["_meta"]["last_penalized_day"] = stamp
-    save_scores(scores)
-
-    if penalized:
-        channel = discord.utils.get(bot.get_all_channels(), name="general")
+async def daily_penalty_check():
+    today = datetime.now(CENTRAL_TZ).date()
+    for guild in bot.guilds:
+        # runs on the writer so no submission can land between the check and the penalty
+        penalized = await ingest.run_exclusive(_catch_up_penalties, stores.get(guild.id), today)
+        if not penalized:
+            continue
+        channel = channels.channel(guild)
         if channel:
-            mentions = ", ".join(f"<@{uid}>" for uid in penalized)
-            await channel.send(f"⏰ Auto-penalty: {mentions} were given 7 tries for missing Wordle #{wordle_num}.")
+            lines = [
+                f"⏰ Auto-penalty: {', '.join(f'<@{uid}>' for uid in uids)} were given 7 tries "
+                f"for missing Wordle #{num}."
+                for num, uids in penalized.items()
+            ]
+            await channel.send("\n".join(lines))
 
 
 MISSING_CHANNEL_ID = "900458273117982791"  # optional channel ID
 
-@tasks.loop(hours=1)
+# guild -> alert/reminder channel, configured per guild with !wordlechannel
+channels = ChannelIndex(stores, defaults={"reminder": int(MISSING_CHANNEL_ID)} if MISSING_CHANNEL_ID.isdigit() else None)
+
 async def nightly_missing_alert():
-    now = datetime.now(CENTRAL_TZ)
-    if now.hour != 20:  # 8 PM Central
-        return
+    for guild in bot.guilds:
+        await _remind_guild(guild)
 
-    scores = load_scores()
-    ensure_meta(scores)
+async def _remind_guild(guild):
+    store = stores.get(guild.id)
+    now = datetime.now(CENTRAL_TZ)
 
     # 🔒 If today is marked as a skip-penalty day (e.g., resetweek run on Sunday),
     #     then don't nag people with reminders either.
     today = now.date()
     today_iso = today.isoformat()
-    if today_iso in scores["_meta"].get("skip_penalty_days", []):
+    if today_iso in store.meta.get("skip_penalty_days", []):
+        return
+    if store.meta.get("last_reminder_day") == today_iso:
         return
+    await ingest.run_exclusive(store.set_meta, "last_reminder_day", today_iso)
 
     wordle_num = str(date_to_wordle(today))
 
-    joined_users = {
-        uid for uid, data in scores.items()
-        if isinstance(data, dict) and data.get("joined")
-    }
-    missing_ids = [uid for uid in joined_users if wordle_num not in scores[uid]["games"]]
+    missing_ids = store.missing(wordle_num)
     if not missing_ids:
         return
 
-    channel = None
-    if MISSING_CHANNEL_ID and MISSING_CHANNEL_ID.isdigit():
-        channel = bot.get_channel(int(MISSING_CHANNEL_ID))
-    if channel is None:
-        channel = discord.utils.get(bot.get_all_channels(), name="general")
+    channel = channels.channel(guild, "reminder")
     if channel is None:
         return
 
-    names = []
-    for uid in missing_ids:
+    mentions = ", ".join(f"<@{uid}>" for uid in missing_ids)
+    await channel.send(f"⏰ Reminder: {mentions} still need to submit today’s Wordle!")
+
+# === Ingestion ===
+async def confirm_recorded(batch):
+    """Confirm a committed batch: one message per channel, then refresh its leaderboard."""
+    by_channel = {}
+    for sub in batch:
+        by_channel.setdefault(sub.channel.id, (sub.channel, []))[1].append(sub)
+    for channel, subs in by_channel.values():
+        lines = [f"✅ Wordle #{s.wordle_num} recorded — {s.tries} tries for {s.author_name}!" for s in subs]
         try:
-            user = await bot.fetch_user(int(uid))
-            names.append(user.display_name)
-        except Exception:
-            pass
+            await channel.send("\n".join(lines))
+        except discord.HTTPException as e:
+            logging.warning("Could not confirm Wordle results in %s: %s", channel.id, e)
+        for _ in subs:
+            publisher.request(channel)
 
-    if names:
-        mentions = ", ".join(f"<@{uid}>" for uid in missing_ids)
-        await channel.send(f"⏰ Reminder: {mentions} still need to submit today’s Wordle!")
+ingest = Ingestor(stores, on_recorded=confirm_recorded)
 
 # === Bot Events ===
 @bot.event
 async def on_ready():
     print(f"✅ Bot is ready as {bot.user} (guilds={len(bot.guilds)})")
-    daily_penalty_check.start()
-    nightly_missing_alert.start()
+    try:
+        stores.claim_home(g.id for g in bot.guilds)
+    except RuntimeError as e:
+        logging.critical("Wordle bot not starting: %s", e)
+        await bot.close()
+        return
+    await stores.preload([g.id for g in bot.guilds])
+    ingest.start()
+    job_scheduler.add_job(daily_penalty_check, "cron", hour=PENALTY_HOUR, minute=0, timezone=CENTRAL_TZ,
+                          id="wordle_penalty", replace_existing=True, coalesce=True, misfire_grace_time=3600)
+    job_scheduler.add_job(nightly_missing_alert, "cron", hour=REMINDER_HOUR, minute=0, timezone=CENTRAL_TZ,
+                          id="wordle_reminder", replace_existing=True, coalesce=True, misfire_grace_time=3600)
+    ensure_scheduler_started()
+    # apply anything missed while we were offline
+    await daily_penalty_check()
+
+@bot.event
+async def on_guild_join(guild):
+    await stores.preload([guild.id])
 
 @bot.event
 async def on_message(message):
     if message.author.bot:
         return
 
-    match = re.search(r"Wordle\s+([\d,]+)\s+(\d|X)/6", message.content)
-    if match:
-        wordle_number = match.group(1).replace(",", "")  # store keys as strings
-        tries = 7 if match.group(2) == "X" else int(match.group(2))
+    today_num = date_to_wordle(datetime.now(CENTRAL_TZ).date())
+    parsed = parse_wordle(message.content, today_num) if message.guild else None
+    if parsed:
+        wordle_number, tries = parsed
         user_id = str(message.author.id)
 
-        scores = load_scores()
-        ensure_meta(scores)
-        if user_id not in scores:
-            scores[user_id] = {"total": 0, "games": {}, "joined": True, "wins": 0}
-
-        if wordle_number in scores[user_id]["games"]:
-            scores[user_id]["total"] -= scores[user_id]["games"][wordle_number]
-
-        scores[user_id]["games"][wordle_number] = tries
-        scores[user_id]["total"] += tries
-
-        save_scores(scores)
-        await message.channel.send(
-            f"✅ Wordle #{wordle_number} recorded — {tries} tries for {message.author.display_name}!"
-        )
-
-        lb_text = await build_leaderboard_text()
-        await message.channel.send(lb_text)
-
-    await bot.process_commands(message)
+        ingest.submit(message.guild.id, user_id, wordle_number, tries, message.channel,
+                      message.author.display_name)
+    elif message.content.startswith(bot.command_prefix):
+        await bot.process_commands(message)
 
 
 # === Commands ===
 @bot.command()
 async def leaderboard(ctx):
-    text = await build_leaderboard_text()
+    text = await build_leaderboard_text(ctx.guild)
     await ctx.send(text)
 
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def lbstats(ctx):
+    """How many leaderboard posts the debounced publisher has saved."""
+    await ctx.send(
+        f"📊 Leaderboard updates requested: {publisher.requests} — "
+        f"sent {publisher.sends}, edited {publisher.edits}, saved {publisher.saved} sends."
+    )
+
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def ingeststats(ctx):
+    """Queue depth and batch sizes of the Wordle ingestion pipeline."""
+    await ctx.send(
+        f"📥 Queue depth: {ingest.depth} — {ingest.committed}/{ingest.submitted} results committed "
+        f"in {ingest.batches} batches (last {ingest.last_batch}, max {ingest.max_batch_seen}, "
+        f"worst latency {ingest.max_latency_ms:.0f} ms)."
+    )
+
 @bot.command()
 async def joinwordle(ctx):
-    scores = load_scores()
-    uid = str(ctx.author.id)
-    if uid not in scores:
-        scores[uid] = {"total": 0, "games": {}, "joined": True, "wins": 0}
-    else:
-        scores[uid]["joined"] = True
-    save_scores(scores)
+    await ingest.run_exclusive(_store(ctx).set_joined, str(ctx.author.id), True)
     await ctx.send(f"{ctx.author.mention} joined the daily Wordle challenge!")
 
 @bot.command()
 async def leavewordle(ctx):
-    scores = load_scores()
     uid = str(ctx.author.id)
-    if uid in scores:
-        scores[uid]["joined"] = False
-        save_scores(scores)
+    store = _store(ctx)
+    if store.get(uid) is not None:
+        await ingest.run_exclusive(store.set_joined, uid, False)
         await ctx.send(f"{ctx.author.mention} left the daily Wordle challenge.")
 
-@bot.command()
-@commands.has_permissions(administrator=True)
-async def resetweek(ctx):
-    scores = load_scores()
-    ensure_meta(scores)
+def _live_week_start(store) -> str:
+    """Monday (ISO) of the week holding the earliest live game."""
+    firsts = [data["games"].base for _, data in store.users() if len(data["games"])]
+    first = wordle_to_date(min(firsts)) if firsts else datetime.now(CENTRAL_TZ).date()
+    return (first - timedelta(days=first.weekday())).isoformat()
 
+def _plan_week(store):
+    """Compute phase, memory only: (top_total, podium, skip_days) or None if nobody joined scored."""
     # ONLY count players currently joined
-    entries = [
-        (uid, data) for uid, data in scores.items()
-        if _is_user_record(uid, data) and data.get("joined")
-    ]
-    if not entries:
-        await ctx.send("No joined players to score this week.")
-        return
-
-    # Sort by weekly total ascending (lower total = better)
-    entries.sort(key=lambda x: x[1]["total"])
-    top_total = entries[0][1]["total"]
-
-    # Build blocks of tied ranks (competition ranking: 1,2,2,4)
-    blocks, i = [], 0
-    while i < len(entries):
-        same = [entries[i]]
-        j = i + 1
-        while j < len(entries) and entries[j][1]["total"] == entries[i][1]["total"]:
-            same.append(entries[j])
-            j += 1
-        rank = i + 1
-        blocks.append((rank, same))
-        i = j
-
-    def ids(block):
-        return [uid for uid, _ in block]
-
-    # Compute last place among joined only (for waffle)
-    worst_total = max(d["total"] for _, d in entries)
-    waffle_ids = [uid for uid, d in entries if d["total"] == worst_total]
-
-    # Podium:
-    # gold  = everyone tied for best (rank 1)
-    # silver = everyone in rank 2 block (if any)
-    # bronze = everyone in rank 3 block (if any)
-    rank1, block1 = blocks[0]
-    gold_ids = ids(block1)
-
-    silver_ids = []
-    bronze_ids = []
-
-    for r, blk in blocks[1:]:
-        if r == 2 and not silver_ids:
-            silver_ids = ids(blk)
-        elif r == 3 and not bronze_ids:
-            bronze_ids = ids(blk)
-
-    # Store last week's podium + waffle
-    scores["_meta"]["last_podium"] = {
-        "gold": gold_ids,
-        "silver": silver_ids,
-        "bronze": bronze_ids,
-        "waffle": waffle_ids,
-    }
-
-    # Increment wins for all gold players
-    for uid in gold_ids:
-        scores[uid]["wins"] = scores[uid].get("wins", 0) + 1
-
-    # Announce winners
-    if len(gold_ids) == 1:
-        winner_id = gold_ids[0]
-        winner_user = await bot.fetch_user(int(winner_id))
-        await ctx.send(
-            f"🎉 Congrats {winner_user.display_name} for winning the week with {top_total} total tries!"
-        )
-    else:
-        names = []
-        for uid in gold_ids:
-            u = await bot.fetch_user(int(uid))
-            names.append(u.display_name)
-        await ctx.send(
-            f"🎉 Weekly tie! Shared gold for: {', '.join(names)} with {top_total} total tries!"
-        )
-
-    # Announce last place (waffle) + increment waffle counters
-    if waffle_ids:
-        names = []
-        for uid in waffle_ids:
-            # increment waffle count on the user record
-            scores[uid]["waffles"] = scores[uid].get("waffles", 0) + 1
+    joined = store.joined_users()
+    blocks = store.board.blocks(only=joined.__contains__)
+    if not blocks:
+        return None
 
-            u = await bot.fetch_user(int(uid))
-            names.append(f"🧇 {u.display_name}")
-        await ctx.send("😬 Last place this week: " + ", ".join(names))
+    # Podium + waffle straight from the sorted index (lower total = better)
+    _, top_total, _ = blocks[0]
+    podium = store.board.podium(only=joined.__contains__)
 
     # --- Keep your existing Sunday-skip logic for penalties ---
+    skip_days = None
     today_cst = datetime.now(CENTRAL_TZ).date()
     if today_cst.weekday() == 6:   # Monday=0 ... Sunday=6
         sunday_iso = today_cst.isoformat()
-        lst = scores["_meta"].get("skip_penalty_days", [])
-        if sunday_iso not in lst:
-            lst.append(sunday_iso)
-        scores["_meta"]["skip_penalty_days"] = lst
-
-    # Reset week but keep wins/joined
-    for uid, data in list(scores.items()):
-        if _is_user_record(uid, data):
-            data["games"] = {}
-            data["total"] = 0
-            scores[uid] = data
+        skip_days = list(store.meta.get("skip_penalty_days", []))
+        if sunday_iso not in skip_days:
+            skip_days.append(sunday_iso)
+    return top_total, podium, skip_days
+
+async def _close_week(store):
+    """Plan, then commit podium/wins/waffles/archive/reset in one transaction: (top_total, podium) or None."""
+    plan = _plan_week(store)
+    if plan is None:
+        return None
+    top_total, podium, skip_days = plan
+    await asyncio.wrap_future(store.close_week(_live_week_start(store), podium, skip_days))
+    return top_total, podium
+
+def _week_announcement(top_total: int, podium: dict, display: dict) -> str:
+    gold_ids, waffle_ids = podium["gold"], podium["waffle"]
+    if len(gold_ids) == 1:
+        lines = [f"🎉 Congrats {display[gold_ids[0]]} for winning the week with {top_total} total tries!"]
+    else:
+        gold_names = [display[uid] for uid in gold_ids]
+        lines = [f"🎉 Weekly tie! Shared gold for: {', '.join(gold_names)} with {top_total} total tries!"]
+    if waffle_ids:
+        waffle_names = [f"🧇 {display[uid]}" for uid in waffle_ids]
+        lines.append("😬 Last place this week: " + ", ".join(waffle_names))
+    lines.append("Scores have been reset for the new week!")
+    return "\n".join(lines)
 
-    save_scores(scores)
-    await ctx.send("Scores have been reset for the new week!")
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def resetweek(ctx):
+    # scored and reset on the writer, so no submission lands between the two
+    closed = await ingest.run_exclusive(_close_week, _store(ctx))
+    if closed is None:
+        await ctx.send("No joined players to score this week.")
+        return
+    # name lookups can be slow; do them after releasing the writer
+    top_total, podium = closed
+    display = await names.resolve(podium["gold"] + podium["waffle"], ctx.guild)
+    await ctx.send(_week_announcement(top_total, podium, display))
 
 
 @bot.command()
 async def wins(ctx):
-    scores = load_scores()
-    lines = [
-        f"**{await bot.fetch_user(int(uid))}** — {data.get('wins', 0)} wins"
-        for uid, data in scores.items()
-        if isinstance(data, dict) and data.get("wins", 0) > 0
-    ]
+    store = _store(ctx)
+    winners = [(uid, data) for uid, data in store.users() if data.get("wins", 0) > 0]
+    display = await names.resolve([uid for uid, _ in winners], ctx.guild)
+    lines = [f"**{display[uid]}** — {data.get('wins', 0)} wins" for uid, data in winners]
     if lines:
         await ctx.send("__**🥇 Weekly Wins**__\n" + "\n".join(lines))
     else:
@@ -399,54 +365,268 @@ async def wins(ctx):
 @bot.command()
 async def waffle(ctx):
     """Show how many times each player has finished last (waffle)."""
-    scores = load_scores()
-    lines = [
-        f"**{await bot.fetch_user(int(uid))}** — {data.get('waffles', 0)} waffles"
-        for uid, data in scores.items()
-        if isinstance(data, dict) and data.get("waffles", 0) > 0
-    ]
+    store = _store(ctx)
+    wafflers = [(uid, data) for uid, data in store.users() if data.get("waffles", 0) > 0]
+    display = await names.resolve([uid for uid, _ in wafflers], ctx.guild)
+    lines = [f"**{display[uid]}** — {data.get('waffles', 0)} waffles" for uid, data in wafflers]
 
     if lines:
         await ctx.send("__**🧇 Waffle Count**__\n" + "\n".join(lines))
     else:
         await ctx.send("No waffles recorded yet. Everyone’s safe… for now.")
 
+def _parse_day(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return None
+
+@bot.command()
+async def alltime(ctx, since: str = None, until: str = None):
+    """Archived weeks per player: average tries/game, best week, golds, waffles. Optional YYYY-MM-DD range."""
+    first = _parse_day(since) if since else "0000-00-00"
+    last = _parse_day(until) if until else "9999-99-99"
+    if first is None or last is None:
+        await ctx.send("❌ Dates must look like 2025-01-31.")
+        return
+
+    rows = await _store(ctx).alltime(first, last)
+    if not rows:
+        await ctx.send("No archived weeks in that range yet.")
+        return
+    display = await names.resolve([r["user_id"] for r in rows], ctx.guild)
+    lines = [
+        f"**{display[str(r['user_id'])]}** — {r['avg_tries']:.2f} avg over {r['games']} games, "
+        f"{r['weeks']} weeks, best week {r['best_week']} (🥇{r['golds']} 🧇{r['waffles']})"
+        for r in rows
+    ]
+    span = f" ({since or 'start'} → {until or 'now'})" if since or until else ""
+    await ctx.send(f"__**📚 All-time Wordle{span}**__\n" + "\n".join(lines))
+
+@bot.command()
+async def h2h(ctx, a: discord.User, b: discord.User = None):
+    """Head-to-head over archived weeks (lower weekly total wins)."""
+    if b is None:
+        a, b = ctx.author, a
+    rows = await _store(ctx).head_to_head(str(a.id), str(b.id))
+    if not rows:
+        await ctx.send("Those two have no archived weeks in common.")
+        return
+    a_wins = sum(1 for r in rows if r["a_total"] < r["b_total"])
+    b_wins = sum(1 for r in rows if r["b_total"] < r["a_total"])
+    ties = len(rows) - a_wins - b_wins
+    display = await names.resolve([a.id, b.id], ctx.guild)
+    await ctx.send(
+        f"⚔️ **{display[str(a.id)]}** {a_wins} — {b_wins} **{display[str(b.id)]}** "
+        f"({ties} tied, {len(rows)} weeks)"
+    )
+
+def _period_bounds(period: str, until: str = None):
+    """(first_day, last_day) for week / month / season (calendar quarter) / YYYY-MM-DD [YYYY-MM-DD]."""
+    today = datetime.now(CENTRAL_TZ).date()
+    if period == "week":
+        return today - timedelta(days=today.weekday()), today
+    if period == "month":
+        return today.replace(day=1), today
+    if period == "season":
+        return date(today.year, 3 * ((today.month - 1) // 3) + 1, 1), today
+    first = _parse_day(period)
+    last = _parse_day(until) if until else today.isoformat()
+    if first is None or last is None:
+        return None
+    return date.fromisoformat(first), date.fromisoformat(last)
+
+@bot.command()
+async def ranking(ctx, period: str = "month", until: str = None):
+    """Rank joined players by total tries over a window: week, month, season or a YYYY-MM-DD [YYYY-MM-DD] range."""
+    bounds = _period_bounds(period.lower(), until)
+    if bounds is None:
+        await ctx.send("❌ Use week, month, season or dates like 2025-01-31.")
+        return
+    first_day, last_day = bounds
+    # only joined players take penalties for missed days, so anyone else would win by skipping
+    store = _store(ctx)
+    rows = store.window_totals(date_to_wordle(first_day), date_to_wordle(last_day), store.joined_users())
+    if not rows:
+        await ctx.send("No games in that window.")
+        return
+
+    # same competition ranking + podium as the weekly board
+    games = {uid: n for uid, _, n in rows}
+    board = LeaderboardIndex()
+    board.reset((uid, tries) for uid, tries, _ in rows)
+    podium = board.podium()
+    medal = {uid: m for key, m in (("gold", "🥇 "), ("silver", "🥈 "), ("bronze", "🥉 "), ("waffle", "🧇 "))
+             for uid in podium[key]}
+
+    display = await names.resolve(list(games), ctx.guild)
+    lines = [
+        f"{rank}. {medal.get(uid, '')}**{display[uid]}** — {total} tries ({games[uid]} games)"
+        for rank, total, uids in board.blocks() for uid in uids
+    ]
+    await ctx.send(f"__**🏁 Wordle ranking {first_day} → {last_day}**__\n" + "\n".join(lines))
+
+def _rolling(store, uid: str, today_num: int, days: int) -> str:
+    tries, games = store.ranges[uid].window(today_num - days + 1, today_num)
+    return f"{tries / games:.2f} ({games} games)" if games else "—"
+
+@bot.command()
+async def stats(ctx, member: discord.User = None):
+    """Tries distribution, streaks, fail rate and rolling averages over all stored games."""
+    member = member or ctx.author
+    uid = str(member.id)
+    store = _store(ctx)
+    st = store.stats(uid)
+    if st is None or not st.played:
+        await ctx.send(f"No Wordle results for {member.display_name} yet.")
+        return
+    today_num = date_to_wordle(datetime.now(CENTRAL_TZ).date())
+    display = await names.resolve([uid], ctx.guild)
+    await ctx.send(
+        f"__**📈 Wordle stats for {display[uid]}**__\n"
+        f"{st.played} games · {st.average:.2f} avg · {st.fail_rate:.0%} failed\n"
+        f"🔥 Streak {st.current_streak(today_num)} (best {st.best_streak})\n"
+        f"Last 7 days {_rolling(store, uid, today_num, 7)} · "
+        f"last 30 days {_rolling(store, uid, today_num, 30)}\n"
+        + "\n".join(histogram_lines(st.histogram))
+    )
+
+@bot.command()
+async def groupstats(ctx):
+    """Combined tries distribution and fail rate of every joined player."""
+    store = _store(ctx)
+    group = [st for st in map(store.stats, store.joined_users()) if st is not None and st.played]
+    if not group:
+        await ctx.send("No Wordle results yet.")
+        return
+    played = sum(st.played for st in group)
+    histogram = merge_histograms(group)
+    await ctx.send(
+        f"__**📊 Group Wordle stats**__\n"
+        f"{len(group)} players · {played} games · {sum(st.total for st in group) / played:.2f} avg · "
+        f"{histogram[-1] / played:.0%} failed\n"
+        + "\n".join(histogram_lines(histogram))
+    )
+
 @bot.command()
 async def missing(ctx):
-    scores = load_scores()
     today = datetime.now(CENTRAL_TZ).date()
     wordle_num = str(date_to_wordle(today))
 
-    joined_users = {
-        uid for uid, data in scores.items()
-        if isinstance(data, dict) and data.get("joined")
-    }
-    missing = [
-        await bot.fetch_user(int(uid)) for uid in joined_users
-        if wordle_num not in scores[uid]["games"]
-    ]
+    missing = await names.resolve(_store(ctx).missing(wordle_num), ctx.guild)
 
     if missing:
-        await ctx.send("__**📋 Players Missing Today's Wordle**__\n" + ", ".join(user.name for user in missing))
+        await ctx.send("__**📋 Players Missing Today's Wordle**__\n" + ", ".join(missing.values()))
     else:
         await ctx.send("✅ Everyone has submitted today's Wordle!")
 
+BACKFILL_BATCH = 500
+
+async def _backfill_commit(store, games, channel_id: int, last_id: int):
+    """
+    Write a backfill batch and advance the channel's checkpoint in the same
+    transaction. Results from weeks that were already closed (or, with no
+    archive yet, from before this week) go to the weeks archive instead of
+    the live week.
+    """
+    checkpoints = dict(store.meta.get("backfill_checkpoints", {}))
+    checkpoints[str(channel_id)] = last_id
+    last_closed = await store.last_closed_week()
+    if last_closed:
+        live_from = date_to_wordle(date.fromisoformat(last_closed) + timedelta(days=7))
+    else:
+        # nothing archived yet (fresh or restored database): only this week is live
+        today = datetime.now(CENTRAL_TZ).date()
+        live_from = date_to_wordle(today - timedelta(days=today.weekday()))
+    live, archived = [], {}
+    for game in games:
+        if int(game[1]) >= live_from:
+            live.append(game)
+        else:
+            day = wordle_to_date(int(game[1]))
+            archived.setdefault((day - timedelta(days=day.weekday())).isoformat(), []).append(game)
+    return await store.record_backfill(live, archived, meta={"backfill_checkpoints": checkpoints})
+
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def backfill(ctx, channel: discord.TextChannel = None, since: str = None):
+    """Rebuild scores from channel history (default: this week). Resumes from the last checkpoint."""
+    channel = channel or ctx.channel
+    store = _store(ctx)
+    if since:
+        try:
+            start = datetime.strptime(since, "%Y-%m-%d")
+        except ValueError:
+            await ctx.send("❌ `since` must be a date like 2025-01-31.")
+            return
+    else:
+        today = datetime.now(CENTRAL_TZ).date()
+        monday = today - timedelta(days=today.weekday())
+        start = datetime(monday.year, monday.month, monday.day)
+    after = CENTRAL_TZ.localize(start)
+
+    # don't re-read what an earlier run already ingested
+    checkpoint = store.meta.get("backfill_checkpoints", {}).get(str(channel.id))
+    if checkpoint and discord.utils.snowflake_time(checkpoint) > after:
+        after = discord.Object(id=checkpoint)
+
+    status = await ctx.send(f"⏳ Backfilling Wordle results from {channel.mention}…")
+    scanned = found = 0
+    batch, last_id = [], None
+    async for msg in channel.history(limit=None, after=after, oldest_first=True):
+        scanned += 1
+        last_id = msg.id
+        if not msg.author.bot:
+            posted_num = date_to_wordle(msg.created_at.astimezone(CENTRAL_TZ).date())
+            parsed = parse_wordle(msg.content, posted_num)
+            if parsed:
+                batch.append((str(msg.author.id), *parsed))
+                found += 1
+        if len(batch) >= BACKFILL_BATCH:
+            await ingest.run_exclusive(_backfill_commit, store, batch, channel.id, last_id)
+            batch = []
+            await status.edit(content=f"⏳ Backfilling {channel.mention}: {scanned} messages scanned, "
+                                      f"{found} results so far…")
+
+    if last_id is not None:
+        await ingest.run_exclusive(_backfill_commit, store, batch, channel.id, last_id)
+    await status.edit(content=f"✅ Backfill of {channel.mention} done: {scanned} messages scanned, "
+                              f"{found} Wordle results recorded.")
+    if found:
+        publisher.request(channel)
+
 @bot.command()
 @commands.has_permissions(administrator=True)
 async def backup(ctx):
-    """Create a backup and upload it as a file in Discord."""
-    scores = load_scores()
+    """Create a gzip backup and upload it as a file in Discord (skipped if nothing changed)."""
+    # snapshot exclusively so no batch lands between the archive read and the live scores
+    store = _store(ctx)
+    snap = await ingest.run_exclusive(store.snapshot)
+    last = snap.meta.get("last_backup", {})
     ts = datetime.now(CENTRAL_TZ).strftime("%Y%m%d_%H%M%S")
-    fn = f"scores_backup_{ts}.json"
-    path = f"/tmp/{fn}"
+    fn = f"scores_backup_{ctx.guild.id}_{ts}.json.gz"
 
-    # write to /tmp (still handy if you want to shell in later)
-    with open(path, "w") as f:
-        json.dump(scores, f, indent=2)
+    # decode and compress off the event loop; the digest ignores _meta, so only score changes count
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, fn)
+        digest = await asyncio.to_thread(lambda: write_backup(snap.to_scores(), path))
+        if digest == last.get("sha256"):
+            await ctx.send(f"💾 No changes since the last backup (`{last.get('file')}`).")
+            return
 
-    # upload the file to the channel
-    await ctx.send(
-        content="💾 Backup created:",
-        file=discord.File(path, filename=fn)
-    )
+        await ctx.send(
+            content=f"💾 Backup created (sha256 `{digest[:12]}`):",
+            file=discord.File(path, filename=fn)
+        )
+    await ingest.run_exclusive(store.set_meta, "last_backup", {"file": fn, "sha256": digest})
 
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def wordlechannel(ctx, purpose: str = "alert", channel: discord.TextChannel = None):
+    """Send this server's penalty alerts (alert) or nightly reminders (reminder) to a channel."""
+    if purpose not in ("alert", "reminder"):
+        await ctx.send("❌ Purpose must be `alert` or `reminder`.")
+        return
+    channel = channel or ctx.channel
+    await ingest.run_exclusive(channels.configure, ctx.guild.id, purpose, channel.id)
+    await ctx.send(f"📌 Wordle {purpose}s will go to {channel.mention}.")
@@ -0,0 +1,133 @@
+import json
+import logging
+import sqlite3
+from config import WORDLE_DB_PATH
+from wordle_history import GameHistory
+
+log = logging.getLogger(__name__)
+
+def get_wordle_db(path: str = WORDLE_DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+def init_wordle_db(conn: sqlite3.Connection):
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        joined  INTEGER NOT NULL DEFAULT 1,
+        wins    INTEGER NOT NULL DEFAULT 0,
+        waffles INTEGER NOT NULL DEFAULT 0,
+        history BLOB              -- GameHistory.to_bytes(); mirrors this user's games rows
+    );
+
+    -- current week's results; total = SUM(MIN(tries, 7))
+    CREATE TABLE IF NOT EXISTS games (
+        user_id    INTEGER NOT NULL REFERENCES users(user_id),
+        wordle_num INTEGER NOT NULL,
+        tries      INTEGER NOT NULL,   -- 1..6, 7 = X, 8 = auto-penalty (scores as 7)
+        PRIMARY KEY (user_id, wordle_num)
+    );
+    CREATE INDEX IF NOT EXISTS idx_games_wordle ON games (wordle_num, user_id);
+    CREATE INDEX IF NOT EXISTS idx_users_joined ON users (user_id) WHERE joined = 1;
+
+    -- the old `_meta` record, one JSON-encoded value per key
+    CREATE TABLE IF NOT EXISTS meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+
+    -- append-only weekly archive, written by resetweek before the live week is cleared
+    CREATE TABLE IF NOT EXISTS weeks (
+        week_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+        week_start TEXT NOT NULL,     -- Monday (YYYY-MM-DD) of the week's first game
+        closed_at  TEXT NOT NULL      -- ISO timestamp in UTC
+    );
+    CREATE INDEX IF NOT EXISTS idx_weeks_start ON weeks (week_start);
+
+    CREATE TABLE IF NOT EXISTS week_results (
+        week_id INTEGER NOT NULL REFERENCES weeks(week_id),
+        user_id INTEGER NOT NULL,
+        total   INTEGER NOT NULL,
+        games   INTEGER NOT NULL,
+        place   TEXT,                 -- 'gold' | 'silver' | 'bronze' | 'waffle' | NULL
+        history BLOB NOT NULL,        -- GameHistory.to_bytes() for that week
+        PRIMARY KEY (week_id, user_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_week_results_user ON week_results (user_id, week_id);
+    """)
+    # databases created before the history column existed
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(users)")}
+    if "history" not in cols:
+        conn.execute("ALTER TABLE users ADD COLUMN history BLOB")
+    conn.commit()
+
+# per-player archive summary between two week_start dates (inclusive)
+ALLTIME_SQL = """
+    SELECT r.user_id,
+           COUNT(*)                          AS weeks,
+           SUM(r.games)                      AS games,
+           SUM(r.total) * 1.0 / SUM(r.games) AS avg_tries,
+           MIN(r.total)                      AS best_week,
+           SUM(r.place IS 'gold')            AS golds,
+           SUM(r.place IS 'waffle')          AS waffles
+    FROM week_results r JOIN weeks w ON w.week_id = r.week_id
+    WHERE w.week_start BETWEEN ? AND ? AND r.games > 0
+    GROUP BY r.user_id
+    ORDER BY avg_tries
+"""
+
+# weeks where both players have results: (a_total, b_total) per shared week
+HEAD_TO_HEAD_SQL = """
+    SELECT w.week_start, a.total AS a_total, b.total AS b_total
+    FROM week_results a
+    JOIN week_results b ON b.week_id = a.week_id AND b.user_id = ?
+    JOIN weeks w ON w.week_id = a.week_id
+    WHERE a.user_id = ?
+    ORDER BY a.week_id
+"""
+
+def import_scores_json(conn: sqlite3.Connection, scores: dict) -> int:
+    """
+    One-shot migration of the scores.json / WORDLE_DATA_PATH layout
+    ({uid: {total, games, joined, wins, waffles}, "_meta": {...}}), plus the
+    weekly archive under "_weeks" if the file came from a backup.
+    Runs in a single transaction; returns the number of users imported.
+    """
+    users, games = [], []
+    for uid, data in scores.items():
+        if str(uid).startswith("_") or not isinstance(data, dict) or "games" not in data:
+            continue
+        users.append((int(uid), 1 if data.get("joined") else 0,
+                      int(data.get("wins", 0)), int(data.get("waffles", 0))))
+        hist, skipped = GameHistory.from_games(data["games"].items())
+        if skipped:
+            log.warning("Skipping out-of-range Wordle results for %s: %s", uid, skipped)
+        games.extend((int(uid), int(num), tries) for num, tries in hist.items())
+
+    meta = scores.get("_meta") if isinstance(scores.get("_meta"), dict) else {}
+    weeks = scores.get("_weeks") if isinstance(scores.get("_weeks"), list) else []
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO users (user_id, joined, wins, waffles) VALUES (?, ?, ?, ?)", users)
+        conn.executemany(
+            "INSERT OR REPLACE INTO games (user_id, wordle_num, tries) VALUES (?, ?, ?)", games)
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(k, json.dumps(v)) for k, v in meta.items()])
+        for week in weeks:
+            week_id = conn.execute("INSERT INTO weeks (week_start, closed_at) VALUES (?, ?)",
+                                   (week["week_start"], week["closed_at"])).lastrowid
+            results = []
+            for uid, r in week["results"].items():
+                hist, skipped = GameHistory.from_games(r["games"].items())
+                if skipped:
+                    log.warning("Skipping out-of-range Wordle results for %s in week %s: %s",
+                                uid, week["week_start"], skipped)
+                results.append((week_id, int(uid), hist.total, len(hist), r.get("place"), hist.to_bytes()))
+            conn.executemany("""
+                INSERT INTO week_results (week_id, user_id, total, games, place, history)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, results)
+    return len(users)
@@ -0,0 +1,155 @@
+# wordle_guilds.py
+import asyncio
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import discord
+
+from wordle_store import ScoreStore
+
+log = logging.getLogger(__name__)
+
+
+class GuildStores:
+    """
+    One ScoreStore per Discord guild, loaded by preload() at startup / on
+    join (off the event loop), or on first use for any guild it missed.
+
+    Each guild gets its own SQLite file (wordle_<guild_id>.db next to the
+    main database) with its own writer thread, so partitions load, commit and
+    back up independently and one server's traffic never rewrites another's
+    rows. Scores, meta and the penalty/reminder bookkeeping in meta all live
+    in the partition.
+
+    The original database (and its legacy JSON seed) belongs to the home
+    guild: WORDLE_HOME_GUILD_ID if set, else the guild recorded in its
+    `guild_id` meta key, else (see claim_home) the only guild the bot is in.
+    It is never handed to whichever guild happens to ask first.
+    """
+
+    def __init__(self, db_path, legacy_json: Path | None = None, home_guild_id: int = 0):
+        self.db_path = Path(db_path)
+        self.legacy_json = legacy_json
+        self.home = home_guild_id or self._claimed_home()
+        self._stores: dict[int, ScoreStore] = {}
+
+    def _claimed_home(self) -> int:
+        if not self.db_path.exists():
+            return 0
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key='guild_id'").fetchone()
+        except sqlite3.OperationalError:   # no meta table yet
+            row = None
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else 0
+
+    def has_legacy_data(self) -> bool:
+        return self.db_path.exists() or bool(self.legacy_json and self.legacy_json.exists())
+
+    def claim_home(self, guild_ids):
+        """
+        Settle the home guild at startup, before any store is loaded. A single
+        guild adopts existing data; with several and no configured home,
+        raise rather than start every guild on an empty partition.
+        """
+        guild_ids = list(guild_ids)
+        if self.home or not self.has_legacy_data():
+            return
+        if len(guild_ids) != 1:
+            raise RuntimeError(f"{len(guild_ids)} guilds and existing Wordle data in {self.db_path}: "
+                               "set WORDLE_HOME_GUILD_ID to the guild that owns it")
+        self.home = guild_ids[0]
+
+    def path_for(self, guild_id: int) -> Path:
+        if guild_id == self.home:
+            return self.db_path
+        return self.db_path.with_name(f"wordle_{guild_id}.db")
+
+    def _open(self, guild_id: int) -> ScoreStore:
+        legacy = self.legacy_json if guild_id == self.home else None
+        return ScoreStore(self.path_for(guild_id), legacy_json=legacy).load()
+
+    def _add(self, guild_id: int, store: ScoreStore) -> ScoreStore:
+        self._stores[guild_id] = store
+        if guild_id == self.home and store.meta.get("guild_id") != guild_id:
+            # remember the configured home so the database stays tied to it
+            store.set_meta("guild_id", guild_id)
+            log.info("Guild %s owns the original Wordle database", guild_id)
+        return store
+
+    def get(self, guild_id: int) -> ScoreStore:
+        store = self._stores.get(guild_id)
+        if store is None:
+            store = self._add(guild_id, self._open(guild_id))
+        return store
+
+    async def preload(self, guild_ids):
+        """Load the stores for `guild_ids` in a worker thread so the event loop never blocks on SQLite."""
+        for guild_id in guild_ids:
+            if guild_id in self._stores:
+                continue
+            store = await asyncio.to_thread(self._open, guild_id)
+            if guild_id in self._stores:   # loaded by get() while we waited
+                store.close()
+            else:
+                self._add(guild_id, store)
+
+    def items(self):
+        return list(self._stores.items())
+
+    def close(self):
+        for store in self._stores.values():
+            store.close()
+
+
+class ChannelIndex:
+    """
+    guild id -> channel id for each announcement purpose ("alert", "reminder").
+
+    A guild's configured channel is stored in its partition's meta as
+    `<purpose>_channel_id`; without one, reminders use `defaults` (if that
+    channel is in the guild) and then fall back to the alert channel, which
+    itself defaults to the guild's #general. Lookups are cached so no job
+    ever scans the channels of every guild.
+    """
+
+    META_KEY = "{}_channel_id"
+
+    def __init__(self, stores: GuildStores, defaults: Optional[dict[str, int]] = None,
+                 fallback_name: str = "general"):
+        self.stores = stores
+        self.defaults = defaults or {}
+        self.fallback_name = fallback_name
+        self._ids: dict[tuple[int, str], int] = {}
+
+    def _lookup(self, guild: discord.Guild, purpose: str) -> Optional[int]:
+        cid = self.stores.get(guild.id).meta.get(self.META_KEY.format(purpose))
+        if cid and guild.get_channel(cid):
+            return cid
+        default = self.defaults.get(purpose)
+        if default and guild.get_channel(default):
+            return default
+        if purpose != "alert":
+            return self._lookup(guild, "alert")
+        general = discord.utils.get(guild.text_channels, name=self.fallback_name)
+        return general.id if general else None
+
+    def channel(self, guild: discord.Guild, purpose: str = "alert"):
+        key = (guild.id, purpose)
+        if key not in self._ids:
+            cid = self._lookup(guild, purpose)
+            if cid is None:
+                return None
+            self._ids[key] = cid
+        return guild.get_channel(self._ids[key])
+
+    def configure(self, guild_id: int, purpose: str, channel_id: int):
+        """Point `purpose` at a channel for one guild and persist it in that guild's meta."""
+        for key in [k for k in self._ids if k[0] == guild_id]:
+            del self._ids[key]   # reminder may have been following alert
+        return self.stores.get(guild_id).set_meta(self.META_KEY.format(purpose), channel_id)
@@ -0,0 +1,186 @@
+# wordle_history.py
+import struct
+from array import array
+from itertools import repeat
+
+NOT_PLAYED = 0          # sentinel byte; real results are 1..6, 7 = X
+FAIL = 7
+PENALTY = 8             # auto-penalty for a missed day: scores like an X but isn't a game played
+MAX_SPAN = 4096         # days one history may cover (~11 years), so one bad number can't balloon it
+_HEADER = struct.Struct("<I")   # base Wordle number
+
+
+def score(tries: int) -> int:
+    """Tries a stored byte counts for in totals (a penalty counts as an X)."""
+    return FAIL if tries == PENALTY else tries
+
+
+class GameHistory:
+    """
+    One player's results as a byte array indexed by Wordle number.
+
+    A Wordle number is already the day offset from WORDLE_EPOCH, so byte i
+    holds the tries for Wordle `base + i` (NOT_PLAYED if none, PENALTY for
+    a missed day). Total (penalties scored as FAIL) and entry count are
+    cached and kept in step by __setitem__. Behaves like the
+    old {str(num): tries} dict for reads (`in`, [], len, items).
+
+    Serialized form is the 4-byte little-endian base followed by the raw
+    bytes, so loading is a single copy out of any buffer (SQLite blob,
+    memoryview over an mmap'd file) with no per-game parsing.
+    """
+
+    __slots__ = ("base", "tries", "total", "count")
+
+    def __init__(self, base: int = 0, tries=b""):
+        self.base = base
+        self.tries = bytearray(tries)
+        self.total = sum(self.tries) - self.tries.count(PENALTY)
+        self.count = len(self.tries) - self.tries.count(NOT_PLAYED)
+
+    @classmethod
+    def from_games(cls, games) -> tuple["GameHistory", list]:
+        """
+        Build a history from (num, tries) pairs, oldest first, and return it
+        with the pairs it had to leave out: tries outside 1..255, or numbers
+        that would stretch it past MAX_SPAN (a bogus "Wordle 20000000" the
+        old parser accepted).
+        """
+        hist, skipped = cls(), []
+        for num, tries in sorted(games, key=lambda g: int(g[0])):
+            if 1 <= int(tries) <= 255 and hist.fits(num):
+                hist[num] = int(tries)
+            else:
+                skipped.append((num, tries))
+        return hist, skipped
+
+    @classmethod
+    def from_bytes(cls, buf) -> "GameHistory":
+        view = memoryview(buf)
+        (base,) = _HEADER.unpack_from(view)
+        return cls(base, view[_HEADER.size:])
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(self.base) + bytes(self.tries)
+
+    def _offset(self, num) -> int:
+        return int(num) - self.base
+
+    def fits(self, num) -> bool:
+        """Whether `num` can be stored without the history spanning more than MAX_SPAN days."""
+        num = int(num)
+        if not 0 <= num <= 0xFFFFFFFF:
+            return False
+        if not self.tries:
+            return True
+        return max(num, self.base + len(self.tries) - 1) - min(num, self.base) < MAX_SPAN
+
+    def __setitem__(self, num, tries: int):
+        num = int(num)
+        if not 1 <= tries <= 255:
+            raise ValueError(f"tries must be 1..255, got {tries}")
+        if not self.fits(num):
+            raise ValueError(f"Wordle {num} is out of range for a history starting at {self.base}")
+        if not self.tries:
+            self.base = num
+        elif num < self.base:
+            self.tries[:0] = bytes(self.base - num)
+            self.base = num
+        i = num - self.base
+        if i >= len(self.tries):
+            self.tries.extend(bytes(i + 1 - len(self.tries)))
+        old = self.tries[i]
+        if old == NOT_PLAYED:
+            self.count += 1
+        self.total += score(tries) - score(old)
+        self.tries[i] = tries
+
+    def get(self, num, default=None):
+        i = self._offset(num)
+        if 0 <= i < len(self.tries) and self.tries[i] != NOT_PLAYED:
+            return self.tries[i]
+        return default
+
+    def __getitem__(self, num) -> int:
+        v = self.get(num)
+        if v is None:
+            raise KeyError(num)
+        return v
+
+    def __contains__(self, num) -> bool:
+        return self.get(num) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def items(self):
+        """(str(num), tries) for played games, oldest first."""
+        return [(str(self.base + i), t) for i, t in enumerate(self.tries) if t != NOT_PLAYED]
+
+    def __iter__(self):
+        return (num for num, _ in self.items())
+
+    def clear(self):
+        self.tries = bytearray()
+        self.total = self.count = 0
+
+    def merge(self, other: "GameHistory") -> int:
+        """Copy every played game from `other` that fits into this history; returns how many didn't."""
+        skipped = 0
+        for num, tries in other.items():
+            if self.fits(num):
+                self[num] = tries
+            else:
+                skipped += 1
+        return skipped
+
+
+class RangeTotals:
+    """
+    Prefix sums of tries and games played over Wordle numbers for one player.
+
+    _tries[i] / _games[i] hold the sums for Wordles base .. base+i-1, so the
+    total for any window [first, last] is two subtractions. New results are
+    almost always for the latest day, so set() usually only appends; an edit
+    further back patches the suffix after it.
+    """
+
+    __slots__ = ("hist", "_tries", "_games")
+
+    def __init__(self, hist: GameHistory | None = None):
+        self.hist = hist if hist is not None else GameHistory()
+        self._rebuild()
+
+    def _rebuild(self):
+        self._tries = array("q", [0])
+        self._games = array("q", [0])
+        for t in self.hist.tries:
+            self._tries.append(self._tries[-1] + score(t))
+            self._games.append(self._games[-1] + (t != NOT_PLAYED))
+
+    def set(self, num, tries: int):
+        num = int(num)
+        old = self.hist.get(num, NOT_PLAYED)
+        if self.hist.tries and num < self.hist.base:
+            self.hist[num] = tries
+            self._rebuild()
+            return
+        self.hist[num] = tries
+        i = num - self.hist.base
+        grow = len(self.hist.tries) + 1 - len(self._tries)
+        if grow > 0:
+            self._tries.extend(repeat(self._tries[-1], grow))
+            self._games.extend(repeat(self._games[-1], grow))
+        dt, dg = score(tries) - score(old), (old == NOT_PLAYED)
+        for j in range(i + 1, len(self._tries)):
+            self._tries[j] += dt
+            self._games[j] += dg
+
+    def window(self, first_num: int, last_num: int) -> tuple[int, int]:
+        """(total tries, games played) for Wordles first_num..last_num inclusive."""
+        n = len(self._tries) - 1
+        lo = max(int(first_num) - self.hist.base, 0)
+        hi = min(int(last_num) - self.hist.base + 1, n)
+        if hi <= lo:
+            return 0, 0
+        return self._tries[hi] - self._tries[lo], self._games[hi] - self._games[lo]
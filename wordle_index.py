@@ -0,0 +1,50 @@
+# wordle_index.py
+
+
+class SubmissionIndex:
+    """
+    Who-has-submitted bitsets, one per Wordle number.
+
+    Every player gets a dense slot (bit position); `joined` is the bitset of
+    joined players and `_days[num]` the bitset of players with a result for
+    that Wordle. "Who is missing #N" is then a single `joined & ~submitted`,
+    independent of how many games are stored.
+    """
+
+    def __init__(self):
+        self._slots: dict[str, int] = {}
+        self._uids: list[str] = []
+        self._days: dict[int, int] = {}
+        self.joined = 0
+
+    def slot(self, uid: str) -> int:
+        s = self._slots.get(uid)
+        if s is None:
+            s = self._slots[uid] = len(self._uids)
+            self._uids.append(uid)
+        return s
+
+    def set_joined(self, uid: str, joined: bool):
+        bit = 1 << self.slot(uid)
+        self.joined = (self.joined | bit) if joined else (self.joined & ~bit)
+
+    def add(self, uid: str, wordle_num: int):
+        num = int(wordle_num)
+        self._days[num] = self._days.get(num, 0) | (1 << self.slot(uid))
+
+    def clear_games(self):
+        self._days.clear()
+
+    def missing_mask(self, wordle_num: int) -> int:
+        return self.joined & ~self._days.get(int(wordle_num), 0)
+
+    def uids(self, mask: int) -> list[str]:
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(self._uids[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+    def missing(self, wordle_num: int) -> list[str]:
+        return self.uids(self.missing_mask(wordle_num))
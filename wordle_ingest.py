@@ -0,0 +1,165 @@
+# wordle_ingest.py
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from wordle_guilds import GuildStores
+
+log = logging.getLogger(__name__)
+
+
+class Submission(NamedTuple):
+    guild_id: int
+    uid: str
+    wordle_num: str
+    tries: int
+    channel: Any            # where to confirm
+    author_name: str
+    queued_at: float
+
+
+class _Job(NamedTuple):
+    fn: Callable
+    args: tuple
+    future: asyncio.Future
+
+
+class Ingestor:
+    """
+    Single writer for every guild's Wordle store.
+
+    on_message only parses and calls submit(); one consumer task drains the
+    queue, commits every pending submission in one transaction per guild and then hands
+    the batch to `on_recorded` (confirmations, leaderboard refresh). Anything
+    else that mutates scores (penalties, resets, join/leave) goes through
+    run_exclusive() so it is ordered with the submissions instead of
+    interleaving with them.
+    """
+
+    def __init__(self, stores: GuildStores,
+                 on_recorded: Optional[Callable[[list[Submission]], Awaitable[None]]] = None,
+                 max_batch: int = 200):
+        self.stores = stores
+        self.on_recorded = on_recorded
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: set[asyncio.Task] = set()
+        # metrics
+        self.submitted = 0
+        self.committed = 0
+        self.batches = 0
+        self.last_batch = 0
+        self.max_batch_seen = 0
+        self.max_latency_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="wordle-ingest")
+
+    def submit(self, guild_id: int, uid: str, wordle_num: str, tries: int, channel, author_name: str):
+        self.submitted += 1
+        self.queue.put_nowait(Submission(guild_id, uid, wordle_num, tries, channel, author_name,
+                                         time.monotonic()))
+
+    async def run_exclusive(self, fn: Callable, *args):
+        """Run fn(*args) (sync or async) on the writer, after everything already queued."""
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(_Job(fn, args, fut))
+        return await fut
+
+    async def _run(self):
+        while True:
+            items = [await self.queue.get()]
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+
+            pending: list[Submission] = []
+            for item in items:
+                if isinstance(item, _Job):
+                    await self._commit(pending)
+                    pending = []
+                    await self._run_job(item)
+                else:
+                    pending.append(item)
+            await self._commit(pending)
+
+    async def stop(self):
+        """Commit everything already queued (e.g. on shutdown), then stop the consumer."""
+        if self._task is None or self._task.done():
+            return
+        await self.run_exclusive(lambda: None)
+        self._task.cancel()
+
+    async def _run_job(self, job: _Job):
+        # the caller may have given up (command timeout, cancelled task): its
+        # future is then already done and must not be set again
+        if job.future.done():
+            return
+        try:
+            result = job.fn(*job.args)
+            if inspect.isawaitable(result):
+                result = await result
+            if isinstance(result, concurrent.futures.Future):
+                # a store write: the caller hears about it once it is on disk
+                result = await asyncio.wrap_future(result)
+        except Exception as e:
+            if job.future.done():
+                log.exception("Exclusive Wordle job %s failed after its caller left", job.fn)
+            else:
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+
+    async def _commit(self, batch: list[Submission]):
+        by_guild: dict[int, list[Submission]] = {}
+        for s in batch:
+            by_guild.setdefault(s.guild_id, []).append(s)
+        writes = []
+        for guild_id, subs in by_guild.items():
+            try:
+                store = self.stores.get(guild_id)
+                # one bad result must not sink everyone else's in the batch
+                for s in [s for s in subs if not store.accepts(s.uid, s.wordle_num, s.tries)]:
+                    log.warning("Dropping Wordle #%s (%s tries) from %s in guild %s: can't be stored",
+                                s.wordle_num, s.tries, s.uid, guild_id)
+                    subs.remove(s)
+                if not subs:
+                    continue
+                done = store.record_games([(s.uid, s.wordle_num, s.tries) for s in subs])
+            except Exception:
+                log.exception("Dropping batch of %d Wordle submissions for guild %s", len(subs), guild_id)
+                continue
+            writes.append((guild_id, subs, done))
+
+        # every guild's writer commits in parallel; only confirm what reached disk
+        batch = []
+        for guild_id, subs, done in writes:
+            try:
+                await asyncio.wrap_future(done)
+            except Exception:
+                log.exception("Wordle commit of %d submissions for guild %s failed", len(subs), guild_id)
+                continue
+            batch.extend(subs)
+        if not batch:
+            return
+
+        now = time.monotonic()
+        self.committed += len(batch)
+        self.batches += 1
+        self.last_batch = len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.max_latency_ms = max(self.max_latency_ms, (now - batch[0].queued_at) * 1000)
+
+        if self.on_recorded is not None:
+            task = asyncio.create_task(self.on_recorded(batch))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
@@ -0,0 +1,184 @@
+# wordle_leaderboard.py
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Awaitable, Callable, Iterable, Optional
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+class LeaderboardIndex:
+    """
+    Players kept sorted by weekly total (lower = better).
+
+    Entries live in a list of (total, uid) keys ordered with bisect, so a
+    score change is a binary search + remove/insert instead of a full re-sort.
+    Ranks use competition ranking (1, 2, 2, 4), same as resetweek always did.
+
+    The search is O(log n); the list insert/delete is O(n) but only a memmove
+    of pointers, which stays in the low microseconds for the few hundred
+    players a guild realistically has (~10 µs at 10k). A balanced tree would
+    only pay off far beyond that.
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[int, str]] = []
+        self._totals: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, uid):
+        return uid in self._totals
+
+    def update(self, uid: str, total: int):
+        old = self._totals.get(uid)
+        if old == total:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (old, uid))]
+        self._totals[uid] = total
+        insort(self._keys, (total, uid))
+
+    def remove(self, uid: str):
+        old = self._totals.pop(uid, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (old, uid))]
+
+    def reset(self, totals: Iterable[tuple[str, int]]):
+        self._totals = dict(totals)
+        self._keys = sorted((t, uid) for uid, t in self._totals.items())
+
+    def total(self, uid: str) -> Optional[int]:
+        return self._totals.get(uid)
+
+    def rank(self, uid: str) -> Optional[int]:
+        """Competition rank among everyone on the board."""
+        total = self._totals.get(uid)
+        if total is None:
+            return None
+        return bisect_left(self._keys, (total,)) + 1
+
+    def ranked(self, only: Optional[Callable[[str], bool]] = None) -> list[tuple[str, int]]:
+        """(uid, total) best first, optionally filtered (e.g. joined players)."""
+        return [(uid, t) for t, uid in self._keys if only is None or only(uid)]
+
+    def blocks(self, only: Optional[Callable[[str], bool]] = None) -> list[tuple[int, int, list[str]]]:
+        """Tie blocks as (rank, total, [uids]) — competition ranking: 1,2,2,4."""
+        blocks: list[tuple[int, int, list[str]]] = []
+        for i, (uid, total) in enumerate(self.ranked(only)):
+            if blocks and blocks[-1][1] == total:
+                blocks[-1][2].append(uid)
+            else:
+                blocks.append((i + 1, total, [uid]))
+        return blocks
+
+    def podium(self, only: Optional[Callable[[str], bool]] = None) -> dict[str, list[str]]:
+        """
+        gold   = everyone tied for best (rank 1)
+        silver = everyone in the rank 2 block (if any)
+        bronze = everyone in the rank 3 block (if any)
+        waffle = everyone tied for last
+        """
+        blocks = self.blocks(only)
+        podium: dict[str, list[str]] = {"gold": [], "silver": [], "bronze": [], "waffle": []}
+        if not blocks:
+            return podium
+        podium["gold"] = list(blocks[0][2])
+        for rank, _, uids in blocks[1:]:
+            if rank == 2:
+                podium["silver"] = list(uids)
+            elif rank == 3:
+                podium["bronze"] = list(uids)
+        podium["waffle"] = list(blocks[-1][2])
+        return podium
+
+
+LEADERBOARD_HEADER = "__**🏆 Wordle Leaderboard**__"
+
+
+class LeaderboardPublisher:
+    """
+    Debounced, edit-in-place leaderboard posting.
+
+    request() is called once per recorded Wordle; the first request in a
+    channel opens a `window`-second batch and every request that lands inside
+    it rides along. When the window closes the leaderboard is rendered once and
+    either edits the channel's pinned leaderboard, edits the last one we posted
+    (if it is younger than `edit_within` seconds), or posts a fresh message.
+    """
+
+    def __init__(self, render: Callable[[Optional[discord.Guild]], Awaitable[str]],
+                 bot_user: Callable[[], Optional[discord.abc.User]],
+                 window: float = 20, edit_within: float = 1800):
+        self.render = render
+        self.bot_user = bot_user
+        self.window = window
+        self.edit_within = edit_within
+        self._pending: dict[int, asyncio.Task] = {}
+        self._last: dict[int, discord.Message] = {}
+        self._pinned: dict[int, discord.Message] = {}
+        self.requests = 0
+        self.sends = 0
+        self.edits = 0
+
+    @property
+    def saved(self) -> int:
+        """Leaderboard messages we did not have to send."""
+        return self.requests - self.sends
+
+    def request(self, channel: discord.abc.Messageable):
+        self.requests += 1
+        cid = channel.id  # type: ignore[attr-defined]
+        if cid not in self._pending:
+            self._pending[cid] = asyncio.create_task(self._flush_later(channel))
+
+    async def _flush_later(self, channel):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self._pending.pop(channel.id, None)
+        try:
+            await self.publish(channel)
+        except discord.HTTPException as e:
+            log.warning("Leaderboard publish failed in %s: %s", channel.id, e)
+
+    async def _find_pinned(self, channel) -> Optional[discord.Message]:
+        # only hits are cached: a miss is looked up again next time, so a
+        # leaderboard pinned later (or re-pinned) is picked up
+        found = self._pinned.get(channel.id)
+        if found is None:
+            me = self.bot_user()
+            try:
+                for msg in await channel.pins():
+                    if me and msg.author.id == me.id and msg.content.startswith(LEADERBOARD_HEADER):
+                        found = self._pinned[channel.id] = msg
+                        break
+            except discord.HTTPException:
+                pass
+        return found
+
+    async def publish(self, channel):
+        text = await self.render(getattr(channel, "guild", None))
+
+        target = await self._find_pinned(channel)
+        if target is None:
+            last = self._last.get(channel.id)
+            if last is not None and (discord.utils.utcnow() - last.created_at).total_seconds() < self.edit_within:
+                target = last
+
+        if target is not None:
+            try:
+                await target.edit(content=text)
+                self.edits += 1
+                return
+            except discord.NotFound:
+                # deleted under us; forget it and post fresh
+                if self._pinned.get(channel.id) is target:
+                    del self._pinned[channel.id]
+                self._last.pop(channel.id, None)
+
+        self._last[channel.id] = await channel.send(text)
+        self.sends += 1
@@ -0,0 +1,90 @@
+# wordle_names.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+class _TTLCache:
+    """Tiny LRU with per-entry expiry (uid -> display name)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: int) -> Optional[str]:
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        expires, value = hit
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: int, value: str):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class NameResolver:
+    """
+    Resolve user ids to display names without one REST call per user.
+
+    Order: guild member cache -> client user cache -> TTL/LRU cache -> fetch_user.
+    Remaining misses are fetched concurrently, at most `concurrency` at a time.
+    """
+
+    def __init__(self, bot: discord.Client, ttl: float = 3600, maxsize: int = 1024, concurrency: int = 5):
+        self.bot = bot
+        self.cache = _TTLCache(maxsize, ttl)
+        self._sem = asyncio.Semaphore(concurrency)
+
+    def _cached(self, uid: int, guild: Optional[discord.Guild]) -> Optional[str]:
+        if guild is not None:
+            member = guild.get_member(uid)
+            if member is not None:
+                return member.display_name
+        user = self.bot.get_user(uid)
+        if user is not None:
+            return user.display_name
+        return self.cache.get(uid)
+
+    async def _fetch(self, uid: int) -> Optional[str]:
+        async with self._sem:
+            try:
+                user = await self.bot.fetch_user(uid)
+            except discord.HTTPException as e:
+                log.warning("fetch_user(%s) failed: %s", uid, e)
+                return None
+        self.cache.put(uid, user.display_name)
+        return user.display_name
+
+    async def resolve(self, uids: Iterable, guild: Optional[discord.Guild] = None) -> dict[str, str]:
+        """Map each uid (as str) to a display name; unknown users fall back to their id."""
+        out: dict[str, str] = {}
+        misses: list[int] = []
+        for uid in dict.fromkeys(str(u) for u in uids):
+            name = self._cached(int(uid), guild)
+            if name is None:
+                misses.append(int(uid))
+            else:
+                out[uid] = name
+
+        if misses:
+            fetched = await asyncio.gather(*(self._fetch(uid) for uid in misses))
+            for uid, name in zip(misses, fetched):
+                out[str(uid)] = name if name is not None else f"User {uid}"
+        return out
+
+    async def name(self, uid, guild: Optional[discord.Guild] = None) -> str:
+        return (await self.resolve([uid], guild))[str(uid)]
@@ -0,0 +1,64 @@
+# wordle_parse.py
+import re
+from typing import NamedTuple, Optional
+
+FAIL = 7   # X counts as 7 tries
+MAX_SKEW_DAYS = 3   # how far a share's number may be from today's Wordle (time zones, late posts)
+
+# "Wordle 1,234 3/6*" — thousands separator by locale (, . nbsp, narrow nbsp)
+# and an optional hard-mode star, then the emoji grid if it was pasted: rows
+# of 5 tiles, one per line. Both colour-blind palettes (🟧/🟦) count as tiles.
+# The grid is captured by the same search, so a share costs one regex call.
+_TILES = "⬛⬜\U0001F7E6-\U0001F7E9"    # ⬛⬜ and 🟦🟧🟨🟩 as two ranges
+SHARE_RE = re.compile(
+    r"Wordle\s+(\d+)(?:[,.\u00a0\u202f](\d{3}))?\s+([1-6X])/6(\*?)"
+    r"\s*((?:[%(t)s]{5}[ \t]*\n[ \t]*)*[%(t)s]{5}(?![%(t)s]))?" % {"t": _TILES})
+_TRIES = {"1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "X": FAIL}
+_SOLVED = {"🟩" * 5, "🟧" * 5}
+
+
+class Share(NamedTuple):
+    wordle_num: str   # digits only, the key scores are stored under
+    tries: int        # 1..6, or FAIL for X
+    hard: bool
+
+
+def _parse(content: str, today_num: Optional[int]):
+    """(wordle_num, tries, star) or None; shared by parse_share and parse_wordle."""
+    # most messages are plain chat: two C-level substring checks reject them
+    # before the pattern runs
+    if "/6" not in content or "Wordle" not in content:
+        return None
+    m = SHARE_RE.search(content)
+    if m is None:
+        return None
+    num, thousands, result, star, grid = m.groups()
+    tries = _TRIES[result]
+    if grid is not None:
+        # one row per try, the last row solved unless the result is X
+        if grid.count("\n") + 1 != min(tries, 6) or (grid[-5:] in _SOLVED) == (tries == FAIL):
+            return None
+    if thousands:
+        num += thousands
+    if today_num is not None and abs(int(num) - today_num) > MAX_SKEW_DAYS:
+        return None
+    return num, tries, star
+
+
+def parse_share(content: str, today_num: Optional[int] = None) -> Optional[Share]:
+    """
+    Parse a Wordle share with one regex search, or None.
+
+    When the grid is pasted it has to agree with the score. With `today_num`,
+    numbers more than MAX_SKEW_DAYS away from it are rejected, so nobody can
+    post "Wordle 20000000".
+    """
+    parsed = _parse(content, today_num)
+    return None if parsed is None else Share(parsed[0], parsed[1], bool(parsed[2]))
+
+
+def parse_wordle(content: str, today_num: Optional[int] = None):
+    """(wordle_number, tries) from a share message, or None. X counts as 7."""
+    parsed = _parse(content, today_num)
+    return None if parsed is None else parsed[:2]
+
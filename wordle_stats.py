@@ -0,0 +1,65 @@
+# wordle_stats.py
+from typing import NamedTuple
+
+from wordle_history import FAIL, NOT_PLAYED, PENALTY, GameHistory
+
+LABELS = ("1", "2", "3", "4", "5", "6", "X")
+
+
+class PlayerStats(NamedTuple):
+    """
+    Everything !stats shows that depends only on a player's history.
+
+    Computed in one pass of C-level bytes operations over the GameHistory
+    buffer (count per tries value, split on NOT_PLAYED for streaks), so cost
+    does not grow with Python-level loops over years of games. Auto-penalties
+    are not games: they count as NOT_PLAYED here, so they don't inflate
+    plays or fails and they break streaks.
+    """
+    played: int
+    total: int
+    histogram: tuple[int, ...]   # games finished in 1..6, then X
+    best_streak: int             # longest run of consecutive days with a result
+    tail_streak: int             # run ending at last_num
+    last_num: int                # latest Wordle with a result (base - 1 if none)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.played if self.played else 0.0
+
+    @property
+    def fail_rate(self) -> float:
+        return self.histogram[-1] / self.played if self.played else 0.0
+
+    def current_streak(self, today_num: int) -> int:
+        """Still alive if the last result is today's or yesterday's Wordle."""
+        return self.tail_streak if self.last_num >= today_num - 1 else 0
+
+
+def compute_stats(hist: GameHistory) -> PlayerStats:
+    buf = bytes(hist.tries).replace(bytes([PENALTY]), bytes([NOT_PLAYED])).rstrip(b"\0")
+    runs = buf.split(bytes([NOT_PLAYED]))
+    histogram = tuple(buf.count(t) for t in range(1, FAIL + 1))
+    return PlayerStats(
+        played=sum(histogram),
+        total=sum(buf),
+        histogram=histogram,
+        best_streak=max(map(len, runs)),
+        tail_streak=len(runs[-1]),
+        last_num=hist.base + len(buf) - 1,
+    )
+
+
+def merge_histograms(stats) -> tuple[int, ...]:
+    """Group distribution: element-wise sum of player histograms."""
+    out = [0] * FAIL
+    for s in stats:
+        for i, n in enumerate(s.histogram):
+            out[i] += n
+    return tuple(out)
+
+
+def histogram_lines(histogram, width: int = 20) -> list[str]:
+    peak = max(histogram) or 1
+    return [f"`{label}` {'█' * max(1, round(width * n / peak)) if n else '▏'} {n}"
+            for label, n in zip(LABELS, histogram)]
@@ -0,0 +1,561 @@
+# wordle_store.py
+import asyncio
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from db_batch import commit_units
+from wordle_leaderboard import LeaderboardIndex
+from wordle_index import SubmissionIndex
+from wordle_history import MAX_SPAN, PENALTY, GameHistory, RangeTotals
+from wordle_stats import PlayerStats, compute_stats
+from wordle_backup import read_backup
+from wordle_db import get_wordle_db, init_wordle_db, import_scores_json, ALLTIME_SQL, HEAD_TO_HEAD_SQL
+
+log = logging.getLogger(__name__)
+
+
+class _Write(NamedTuple):
+    statements: list        # (sql, params) of one logical transaction
+    future: Future          # resolved once committed, or with the error it was rolled back for
+
+
+class _Read(NamedTuple):
+    future: Future
+    sql: str
+    params: tuple
+
+_DEF_META = {
+    "last_podium": {"gold": [], "silver": [], "bronze": [], "waffle": []},
+    "skip_penalty_days": [],   # list of ISO dates (YYYY-MM-DD) to not penalize
+    "last_penalized_day": ""   # ISO date we last processed (idempotence)
+}
+
+
+def ensure_meta(scores: dict):
+    if not isinstance(scores, dict):
+        return {"_meta": copy.deepcopy(_DEF_META)}
+    meta = scores.get("_meta")
+    if not isinstance(meta, dict):
+        scores["_meta"] = copy.deepcopy(_DEF_META)
+    else:
+        for k, v in _DEF_META.items():
+            scores["_meta"].setdefault(k, copy.deepcopy(v))
+    return scores
+
+
+# Helper: check if key is a real user record (ignore internal metadata)
+def _is_user_record(k, v):
+    return isinstance(v, dict) and not str(k).startswith("_") and ("total" in v and "games" in v)
+
+
+def _new_user():
+    return {"total": 0, "games": GameHistory(), "joined": True, "wins": 0}
+
+
+_COUNTERS = ("wins", "waffles")
+
+
+def atomic_write_text(path: Path, text: str):
+    """Write via temp file + fsync + rename so readers never see a half-written file."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Snapshot(NamedTuple):
+    users: list        # (uid, record without games, GameHistory bytes)
+    meta: dict
+    weeks: list        # weeks LEFT JOIN week_results rows, oldest week first
+
+    def to_scores(self) -> dict:
+        """
+        The legacy scores.json layout (plain dicts, JSON-ready) plus the weekly
+        archive under `_weeks`. Decodes every history; run it in a thread.
+        """
+        out = {}
+        for uid, rec, history in self.users:
+            out[uid] = dict(rec, games=dict(GameHistory.from_bytes(history).items()))
+        weeks = {}
+        for r in self.weeks:
+            week = weeks.setdefault(r["week_id"], {"week_start": r["week_start"], "closed_at": r["closed_at"],
+                                                   "results": {}})
+            if r["user_id"] is not None:
+                week["results"][str(r["user_id"])] = {
+                    "games": dict(GameHistory.from_bytes(r["history"]).items()), "place": r["place"]}
+        out["_meta"] = self.meta
+        out["_weeks"] = list(weeks.values())
+        return out
+
+
+class ScoreStore:
+    """
+    Resident Wordle score store backed by SQLite.
+
+    State is loaded once into the familiar scores-dict layout for cheap reads.
+    Mutations update memory immediately and queue their SQL for a background
+    writer thread, which owns the connection and folds everything queued since
+    its last commit into one transaction, so the event loop never waits on
+    disk. Each logical write runs in its own savepoint inside that transaction,
+    so a bad statement rolls back only its own unit; every write method returns
+    a concurrent Future that reports the outcome. SQL reads are queued behind
+    pending writes and awaited. On first start an empty database is seeded
+    from the legacy JSON file.
+    """
+
+    def __init__(self, db_path, legacy_json: Path | None = None):
+        self.db_path = str(db_path)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self.scores: dict = {}
+        self.board = LeaderboardIndex()
+        self.submitted = SubmissionIndex()
+        self.ranges: dict[str, RangeTotals] = {}   # archived + live games, for any-window totals
+        self._stats: dict[str, PlayerStats] = {}   # per-user cache, dropped when that user submits
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._unit: list | None = None     # statements of the open transaction
+        self._unit_future: Future | None = None
+        self._depth = 0
+        self.commits = 0                   # transactions actually written
+        self.units = 0                     # logical transactions queued
+
+    # ---------- lifecycle ----------
+
+    def load(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = get_wordle_db(self.db_path)
+        init_wordle_db(conn)
+
+        empty = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+        if empty and self.legacy_json and self.legacy_json.exists():
+            n = import_scores_json(conn, read_backup(self.legacy_json))
+            log.info("Imported %d Wordle players from %s", n, self.legacy_json)
+
+        scores: dict = {}
+        rebuild = set()
+        for r in conn.execute("SELECT user_id, joined, wins, waffles, history FROM users"):
+            uid = str(r["user_id"])
+            # no blob yet (fresh import / older database), or one stretched by a bogus number
+            if r["history"] and len(r["history"]) <= 4 + MAX_SPAN:
+                games = GameHistory.from_bytes(r["history"])
+            else:
+                games = GameHistory()
+                rebuild.add(uid)
+            rec = {"total": games.total, "games": games, "joined": bool(r["joined"]), "wins": r["wins"]}
+            if r["waffles"]:
+                rec["waffles"] = r["waffles"]
+            scores[uid] = rec
+
+        # build those players' histories from their rows once, dropping rows that don't fit
+        rows: dict[str, list] = {uid: [] for uid in rebuild}
+        for r in conn.execute("SELECT user_id, wordle_num, tries FROM games"):
+            if str(r["user_id"]) in rows:
+                rows[str(r["user_id"])].append((r["wordle_num"], r["tries"]))
+        with conn:
+            for uid, games in rows.items():
+                hist, skipped = GameHistory.from_games(games)
+                for num, tries in skipped:
+                    log.warning("Dropping out-of-range Wordle #%s (%s tries) for %s", num, tries, uid)
+                    conn.execute("DELETE FROM games WHERE user_id=? AND wordle_num=?", (int(uid), num))
+                scores[uid]["games"], scores[uid]["total"] = hist, hist.total
+                conn.execute("UPDATE users SET history=? WHERE user_id=?", (hist.to_bytes(), int(uid)))
+        scores["_meta"] = {r["key"]: json.loads(r["value"])
+                           for r in conn.execute("SELECT key, value FROM meta")}
+
+        full: dict[str, GameHistory] = {}
+        skipped = 0
+        for r in conn.execute("SELECT user_id, history FROM week_results ORDER BY week_id"):
+            skipped += full.setdefault(str(r["user_id"]), GameHistory()).merge(GameHistory.from_bytes(r["history"]))
+        conn.close()
+        self.scores = ensure_meta(scores)
+        self.board.reset((uid, data["total"]) for uid, data in self.users())
+        for uid, data in self.users():
+            self.submitted.set_joined(uid, data["joined"])
+            for num in data["games"]:
+                self.submitted.add(uid, num)
+            skipped += full.setdefault(uid, GameHistory()).merge(data["games"])
+        if skipped:
+            log.warning("Left %d out-of-range Wordle results out of the range totals", skipped)
+        self.ranges = {uid: RangeTotals(hist) for uid, hist in full.items()}
+        self._stats.clear()
+
+        self._thread = threading.Thread(target=self._writer, name="wordle-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Flush everything queued and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    # ---------- writer thread ----------
+
+    def _writer(self):
+        conn = get_wordle_db(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes: list[_Write] = []
+            for item in items:
+                if item is None:
+                    stop = True
+                elif isinstance(item, _Write):
+                    writes.append(item)
+                else:
+                    # a read: commit what's queued before it so it sees our own writes
+                    self._commit(conn, writes)
+                    writes = []
+                    try:
+                        item.future.set_result(conn.execute(item.sql, item.params).fetchall())
+                    except Exception as e:
+                        item.future.set_exception(e)
+            self._commit(conn, writes)
+        conn.close()
+
+    @staticmethod
+    def _apply(conn, w: _Write):
+        for sql, params in w.statements:
+            conn.execute(sql, params)
+
+    def _commit(self, conn, writes: list[_Write]):
+        if not writes:
+            return
+        try:
+            results = commit_units(conn, writes, self._apply)
+        except Exception as e:
+            log.exception("Wordle commit of %d writes failed", len(writes))
+            for w in writes:
+                w.future.set_exception(e)
+            return
+        self.commits += 1
+        for w, (_, err) in zip(writes, results):
+            if err is None:
+                w.future.set_result(None)
+            else:
+                # memory already holds the change; the caller decides what to tell the user
+                log.error("Wordle write of %d statements rolled back: %s", len(w.statements), err)
+                w.future.set_exception(err)
+
+    @contextmanager
+    def _tx(self):
+        """Group the statements issued inside into one queued transaction; yields its Future."""
+        if self._depth == 0:
+            self._unit = []
+            self._unit_future = Future()
+        self._depth += 1
+        done = self._unit_future
+        try:
+            yield done
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                unit, self._unit = self._unit, None
+                if unit:
+                    self.units += 1
+                    self._queue.put(_Write(unit, done))
+                else:
+                    done.set_result(None)
+
+    def _exec(self, sql: str, params=()):
+        assert self._unit is not None, "writes must happen inside _tx()"
+        self._unit.append((sql, params))
+
+    async def _read(self, sql: str, params=()):
+        fut: Future = Future()
+        self._queue.put(_Read(fut, sql, params))
+        return await asyncio.wrap_future(fut)
+
+    # ---------- reads ----------
+
+    @property
+    def meta(self) -> dict:
+        return self.scores["_meta"]
+
+    def users(self):
+        """(uid, record) pairs for real user records."""
+        return [(uid, data) for uid, data in self.scores.items() if _is_user_record(uid, data)]
+
+    def joined_users(self):
+        return {uid for uid, data in self.users() if data.get("joined")}
+
+    def get(self, uid: str):
+        return self.scores.get(uid)
+
+    def window_totals(self, first_num: int, last_num: int, uids=None) -> list[tuple[str, int, int]]:
+        """(uid, total tries, games) for every player (or just `uids`) with games in [first_num, last_num]."""
+        out = []
+        for uid, rt in self.ranges.items():
+            if uids is not None and uid not in uids:
+                continue
+            tries, games = rt.window(first_num, last_num)
+            if games:
+                out.append((uid, tries, games))
+        return out
+
+    def stats(self, uid: str) -> PlayerStats | None:
+        """All-time stats for one player, recomputed only after they submit."""
+        st = self._stats.get(uid)
+        if st is None and uid in self.ranges:
+            st = self._stats[uid] = compute_stats(self.ranges[uid].hist)
+        return st
+
+    async def snapshot(self) -> "Snapshot":
+        """
+        Raw copy of the live scores, meta and archive rows for a backup. Run
+        it exclusively so no write lands between the archive read (on the
+        writer thread) and the in-memory copy; decoding is left to
+        Snapshot.to_scores, off the event loop.
+        """
+        weeks = await self._read("""
+            SELECT w.week_id, w.week_start, w.closed_at, r.user_id, r.place, r.history
+            FROM weeks w LEFT JOIN week_results r ON r.week_id = w.week_id
+            ORDER BY w.week_id, r.user_id
+        """)
+        users = [(uid, {k: v for k, v in data.items() if k != "games"}, data["games"].to_bytes())
+                 for uid, data in self.users()]
+        return Snapshot(users, copy.deepcopy(self.meta), weeks)
+
+    async def export(self) -> dict:
+        """Snapshot decoded to the scores.json layout in a worker thread."""
+        return await asyncio.to_thread((await self.snapshot()).to_scores)
+
+    def missing(self, wordle_num) -> list[str]:
+        """Joined players who have not submitted `wordle_num`."""
+        return self.submitted.missing(wordle_num)
+
+    # ---------- writes ----------
+
+    def _user(self, uid: str) -> dict:
+        if uid not in self.scores:
+            self.scores[uid] = _new_user()
+            self.board.update(uid, 0)
+            self.submitted.set_joined(uid, True)
+            self._exec("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (int(uid),))
+        return self.scores[uid]
+
+    def accepts(self, uid: str, wordle_num, tries: int) -> bool:
+        """Whether one result can be stored (tries in range, number within the player's history span)."""
+        user = self.scores.get(uid)
+        rt = self.ranges.get(uid)
+        return (1 <= int(tries) <= PENALTY and GameHistory().fits(wordle_num)
+                and not (user and not user["games"].fits(wordle_num))
+                and not (rt and not rt.hist.fits(wordle_num)))
+
+    def _check_games(self, games):
+        """Reject a batch up front if any result can't be stored, before memory or SQL is touched."""
+        for uid, wordle_num, tries in games:
+            if not self.accepts(uid, wordle_num, tries):
+                raise ValueError(f"Refusing Wordle #{wordle_num} ({tries} tries) for {uid}")
+
+    def _put_game(self, uid: str, wordle_num: str, tries: int):
+        user = self._user(uid)
+        self._exec("""
+            INSERT INTO games (user_id, wordle_num, tries) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, wordle_num) DO UPDATE SET tries = excluded.tries
+        """, (int(uid), int(wordle_num), tries))
+        user["games"][wordle_num] = tries
+        user["total"] = user["games"].total
+        self.ranges.setdefault(uid, RangeTotals()).set(wordle_num, tries)
+        self._stats.pop(uid, None)
+        self._exec("UPDATE users SET history=? WHERE user_id=?", (user["games"].to_bytes(), int(uid)))
+        self.board.update(uid, user["total"])
+        self.submitted.add(uid, wordle_num)
+
+    def _put_meta(self, key: str, value):
+        self._exec("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                   (key, json.dumps(value)))
+        self.meta[key] = value
+
+    def record_game(self, uid: str, wordle_num: str, tries: int) -> Future:
+        self._check_games([(uid, wordle_num, tries)])
+        with self._tx() as done:
+            self._put_game(uid, wordle_num, tries)
+        return done
+
+    def record_games(self, games, meta: dict | None = None) -> Future:
+        """Apply many (uid, wordle_num, tries) results (plus optional meta keys) in one transaction."""
+        games = list(games)
+        self._check_games(games)
+        with self._tx() as done:
+            for uid, wordle_num, tries in games:
+                self._put_game(uid, wordle_num, tries)
+            for key, value in (meta or {}).items():
+                self._put_meta(key, value)
+        return done
+
+    async def record_backfill(self, games, archived: dict[str, list], meta: dict | None = None) -> Future:
+        """
+        Like record_games, plus results from weeks that are already closed:
+        `archived` maps a week's Monday (ISO) to its (uid, wordle_num, tries)
+        results, which are merged into that week's archive row (a week is
+        added if none exists) and the range totals, never the live week.
+        Everything is written in one transaction.
+        """
+        games = list(games)
+        self._check_games(games + [g for week in archived.values() for g in week])
+        starts = list(archived)
+        rows = await self._read(f"""
+            SELECT w.week_start, w.week_id, r.user_id, r.history FROM weeks w
+            LEFT JOIN week_results r ON r.week_id = w.week_id
+            WHERE w.week_id IN (SELECT MAX(week_id) FROM weeks
+                                WHERE week_start IN ({",".join("?" * len(starts))}) GROUP BY week_start)
+        """, starts) if starts else []
+        week_ids = {r["week_start"]: r["week_id"] for r in rows}
+        stored = {(r["week_start"], str(r["user_id"])): GameHistory.from_bytes(r["history"])
+                  for r in rows if r["user_id"] is not None}
+
+        with self._tx() as done:
+            for week_start, week_games in sorted(archived.items()):
+                week_id = week_ids.get(week_start)
+                if week_id is None:
+                    closed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                    self._exec("INSERT INTO weeks (week_start, closed_at) VALUES (?, ?)", (week_start, closed_at))
+                touched = {}
+                for uid, wordle_num, tries in week_games:
+                    hist = touched.get(uid)
+                    if hist is None:
+                        hist = touched[uid] = stored.get((week_start, uid), GameHistory())
+                    hist[wordle_num] = tries
+                    self.ranges.setdefault(uid, RangeTotals()).set(wordle_num, tries)
+                    self._stats.pop(uid, None)
+                for uid, hist in touched.items():
+                    # place is kept: backfill doesn't re-judge a podium that was already announced
+                    self._exec("""
+                        INSERT INTO week_results (week_id, user_id, total, games, place, history)
+                        VALUES (COALESCE(?, (SELECT MAX(week_id) FROM weeks)), ?, ?, ?, NULL, ?)
+                        ON CONFLICT (week_id, user_id) DO UPDATE SET
+                            total = excluded.total, games = excluded.games, history = excluded.history
+                    """, (week_id, int(uid), hist.total, len(hist), hist.to_bytes()))
+            self.record_games(games, meta)
+        return done
+
+    async def last_closed_week(self) -> str | None:
+        """Monday (ISO) of the most recently started archived week, if any."""
+        rows = await self._read("SELECT MAX(week_start) FROM weeks")
+        return rows[0][0]
+
+    def set_joined(self, uid: str, joined: bool) -> Future | None:
+        if not joined and uid not in self.scores:
+            return None
+        with self._tx() as done:
+            self._user(uid)["joined"] = joined
+            self.submitted.set_joined(uid, joined)
+            self._exec("UPDATE users SET joined=? WHERE user_id=?", (int(joined), int(uid)))
+        return done
+
+    def bump(self, uid: str, field: str, n: int = 1) -> Future:
+        if field not in _COUNTERS:
+            raise ValueError(f"Unknown counter {field!r}")
+        with self._tx() as done:
+            user = self._user(uid)
+            user[field] = user.get(field, 0) + n
+            self._exec(f"UPDATE users SET {field} = {field} + ? WHERE user_id=?", (n, int(uid)))
+        return done
+
+    def set_meta(self, key: str, value) -> Future:
+        with self._tx() as done:
+            self._put_meta(key, value)
+        return done
+
+    def missing_range(self, first_num: int, last_num: int, skip_nums=()) -> dict[str, list[str]]:
+        """
+        {wordle_num: [uids]} of joined players missing each Wordle in
+        [first_num, last_num] except `skip_nums` — one bitset AND-NOT per day.
+        """
+        missed: dict[str, list[str]] = {}
+        for num in range(int(first_num), int(last_num) + 1):
+            if num not in skip_nums:
+                uids = self.submitted.missing(num)
+                if uids:
+                    missed[str(num)] = uids
+        return missed
+
+    def penalize(self, missed: dict[str, list[str]], tries: int, stamp: str,
+                 skip_days: list | None = None) -> Future:
+        """
+        Give `tries` for every missed Wordle in `missed`, mark `stamp` as the
+        last penalized day and store the remaining `skip_days`, in one transaction.
+        """
+        with self._tx() as done:
+            for num, uids in missed.items():
+                for uid in uids:
+                    self._put_game(uid, num, tries)
+            self._put_meta("last_penalized_day", stamp)
+            if skip_days is not None:
+                self._put_meta("skip_penalty_days", skip_days)
+        return done
+
+    def archive_week(self, week_start: str, podium: dict) -> Future | None:
+        """Append every player's results for the live week to the archive (before reset_week)."""
+        places = {uid: place for place in ("waffle", "bronze", "silver", "gold") for uid in podium.get(place, [])}
+        played = [(uid, data) for uid, data in self.users() if len(data["games"])]
+        if not played:
+            return None
+        closed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._tx() as done:
+            self._exec("INSERT INTO weeks (week_start, closed_at) VALUES (?, ?)", (week_start, closed_at))
+            for uid, data in played:
+                self._exec("""
+                    INSERT INTO week_results (week_id, user_id, total, games, place, history)
+                    VALUES ((SELECT MAX(week_id) FROM weeks), ?, ?, ?, ?, ?)
+                """, (int(uid), data["total"], len(data["games"]), places.get(uid), data["games"].to_bytes()))
+        return done
+
+    def close_week(self, week_start: str, podium: dict, skip_days: list | None = None) -> Future:
+        """
+        Store the podium, bump wins/waffles, archive the live week and reset it
+        as one transaction, so a crash can't leave the podium saved but the week
+        still open. `skip_days`, if given, replaces skip_penalty_days.
+        """
+        with self._tx() as done:
+            self._put_meta("last_podium", podium)
+            for uid in podium["gold"]:
+                self.bump(uid, "wins")
+            for uid in podium["waffle"]:
+                self.bump(uid, "waffles")
+            if skip_days is not None:
+                self._put_meta("skip_penalty_days", skip_days)
+            self.archive_week(week_start, podium)
+            self.reset_week()
+        return done
+
+    async def alltime(self, first_week: str = "0000-00-00", last_week: str = "9999-99-99"):
+        """Archive summary per player for weeks starting in [first_week, last_week], best average first."""
+        return await self._read(ALLTIME_SQL, (first_week, last_week))
+
+    async def head_to_head(self, uid_a: str, uid_b: str):
+        """(week_start, a_total, b_total) for every archived week both players played."""
+        return await self._read(HEAD_TO_HEAD_SQL, (int(uid_b), int(uid_a)))
+
+    def reset_week(self) -> Future:
+        """Clear games/total for everyone but keep wins/joined."""
+        with self._tx() as done:
+            self._exec("DELETE FROM games")
+            self._exec("UPDATE users SET history=NULL")
+            for _, data in self.users():
+                data["games"].clear()
+                data["total"] = 0
+            self.board.reset((uid, 0) for uid, _ in self.users())
+            self.submitted.clear_games()
+        return done
@@ -1,11 +1,17 @@
 # worker_main.py
 import asyncio
+import signal
 
 from config import LOSER_BOT_TOKEN, WORDLE_BOT_TOKEN
 from loser_challenge_bot import bot as loser_bot          # Loser Challenge bot (your main.py)
 from wordle_bot import bot as wordle_bot   # Wordle bot module you refactored
 
 async def main():
+    # Render stops the worker with SIGTERM: close both bots so queued writes get flushed
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(
+            asyncio.gather(loser_bot.close(), wordle_bot.close())))
 
     await asyncio.gather(
         loser_bot.start(LOSER_BOT_TOKEN),